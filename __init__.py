@@ -15,21 +15,25 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
-from .io_fritzing import svg
-from .io_fritzing import pnp
-from .io_fritzing import assets
-from .io_fritzing import gerber
-
+# the sub packages are imported in register(), so enabling the add-on does not
+# load them before Blender actually registers it
 
 def register():
+    from .io_fritzing import svg
+    from .io_fritzing import pnp
+    from .io_fritzing import assets
+    from .io_fritzing import gerber
     svg.register()
     pnp.register()
     assets.register()
     gerber.register()
 
 def unregister():
+    from .io_fritzing import svg
+    from .io_fritzing import pnp
+    from .io_fritzing import assets
+    from .io_fritzing import gerber
     svg.unregister()
     pnp.unregister()
     assets.unregister()
     gerber.unregister()
-
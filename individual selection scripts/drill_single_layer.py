@@ -6,21 +6,28 @@ import bpy
 # creates a drill hole through an individual layer of the pcb
 # @param layer_name -the layer to drill the holes in
 def drill_layer(layer_name):
-    for area in bpy.context.screen.areas: 
-        if area.type == "VIEW_3D":
-            for space in area.spaces: 
-                if space.type == "VIEW_3D":
-                    space.shading.type = "SOLID"
-    
     layer = bpy.data.objects[layer_name]
     modifier = layer.modifiers.new(name="Boolean", type="BOOLEAN")
     modifier.object = bpy.data.objects["drill_holes"]
-    bpy.context.view_layer.objects.active = layer
-    bpy.ops.object.modifier_apply(apply_as="DATA", modifier="Boolean")
+    # a single layer has no overlapping geometry, so the fast solver is enough
+    modifier.solver = "FAST"
+    # bake the evaluated mesh from the depsgraph instead of bpy.ops.object.modifier_apply
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    new_mesh = bpy.data.meshes.new_from_object(layer.evaluated_get(depsgraph))
+    layer.modifiers.remove(modifier)
+    old_mesh = layer.data
+    layer.data = new_mesh
+    bpy.data.meshes.remove(old_mesh)
 
 
 
 
+for area in bpy.context.screen.areas: 
+    if area.type == "VIEW_3D":
+        for space in area.spaces: 
+            if space.type == "VIEW_3D":
+                space.shading.type = "SOLID"
+
 layer = bpy.context.selected_objects[0]
 drill_layer(layer.name)
       
\ No newline at end of file
@@ -2,23 +2,38 @@
 
 import bpy
 import bmesh
-import math
 from mathutils import Vector
 
 
 
 
 
+##
+# merge distance for layers that do not carry their svg unit, the remove_doubles default
+DEFAULT_MERGE_DISTANCE = 1e-4
+
+##
+# The distance to merge the vertices of a layer within: half an svg user unit after the import scale,
+# the svg coordinates are not more precise than that, so closer points are duplicates
+# @param layer -the layer object, import_single_layer stores the size of its svg user unit as layer["svg_unit"]
+def mergeDistance(layer):
+    svg_unit = layer.get("svg_unit")
+    return 0.5 * svg_unit if svg_unit else DEFAULT_MERGE_DISTANCE
+
+
+
+
 ##
 # Removes the overlapping vertices on all layers
-def removeExtraVerts(layer):
-    bpy.context.view_layer.objects.active = layer
-    bpy.ops.object.editmode_toggle()
-    bpy.ops.mesh.select_mode(type="VERT")
-    bpy.ops.mesh.select_all(action="SELECT")
-    bpy.ops.mesh.remove_doubles()
-    bpy.ops.mesh.select_all(action="DESELECT")
-    bpy.ops.object.editmode_toggle()
+# @param layer -the layer object
+# @param dist -the maximum distance between vertices to merge
+def removeExtraVerts(layer, dist):
+    bm = bmesh.new()
+    bm.from_mesh(layer.data)
+    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=dist)
+    bm.to_mesh(layer.data)
+    bm.free()
+    layer.data.update()
 
 
 
@@ -28,19 +43,33 @@ def removeExtraVerts(layer):
 ##
 # Finds the vertex closest to the origin \(that has to be in the board outline\) and removes all the vertices connected to it.
 def removeOutline(layer):
-    bpy.context.view_layer.objects.active = layer
-    min = layer.data.vertices[0]
-    minDistance = math.sqrt(min.co[0] **2 + min.co[1]**2)
-    for vert in layer.data.vertices:
-        vertDistance = math.sqrt(vert.co[0] **2 + vert.co[1]**2)
-        if(vertDistance < minDistance):
-            min = vert
-            minDistance = vertDistance       
-    min.select = True
-    bpy.ops.object.editmode_toggle()
-    bpy.ops.mesh.select_linked()
-    bpy.ops.mesh.delete(type="VERT")
-    bpy.ops.object.editmode_toggle()
+    import numpy as np
+
+    # squared distance is enough to find the nearest vertex
+    count = len(layer.data.vertices)
+    co = np.empty(count * 3, dtype=np.float32)
+    layer.data.vertices.foreach_get("co", co)
+    co = co.reshape(count, 3)
+    index = int(np.argmin(co[:, 0] ** 2 + co[:, 1] ** 2))
+
+    bm = bmesh.new()
+    bm.from_mesh(layer.data)
+    bm.verts.ensure_lookup_table()
+    min = bm.verts[index]
+    # flood fill along the edges, the same as select_linked in edit mode
+    linked = {min}
+    stack = [min]
+    while stack:
+        vert = stack.pop()
+        for edge in vert.link_edges:
+            other = edge.other_vert(vert)
+            if other not in linked:
+                linked.add(other)
+                stack.append(other)
+    bmesh.ops.delete(bm, geom=list(linked), context="VERTS")
+    bm.to_mesh(layer.data)
+    bm.free()
+    layer.data.update()
     
 
 
@@ -51,9 +80,9 @@ def removeOutline(layer):
 # extrudes all components and sets the vertical position of each layer
 def extrude_layer(layer):
     if layer.name.startswith("board_outline"):
-        removeExtraVerts(layer)
+        removeExtraVerts(layer, mergeDistance(layer))
     else:
-        removeExtraVerts(layer)
+        removeExtraVerts(layer, mergeDistance(layer))
         removeOutline(layer)
         
     if layer.name.startswith("board_outline"):
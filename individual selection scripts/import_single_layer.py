@@ -1,8 +1,14 @@
 
+import os
+import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 import bpy
+from mathutils import Matrix
 from bpy_extras.io_utils import ImportHelper
 from bpy.types import Operator
 from bpy.props import StringProperty, BoolProperty
+from io_curve_svg.svg_util import units, read_float
 
 
 ##
@@ -16,18 +22,15 @@ class ImportPCB(Operator, ImportHelper):
     
     
     def execute(self, context):
-        #filenames = []
         directory = self.properties.filepath
-        #cut = directory.rindex("\\")
-        #directory = directory[0:cut] 
-        """       
-        with open(directory + "\\filenames.txt", mode="r") as file:
-            for line in file:
-               filenames.append(line[0:-1])
-                      
-        for file in filenames:
-            """
-        import_svg(directory)
+        # a folder with a filenames.txt imports every listed layer, otherwise only the selected file
+        filenames_path = os.path.join(os.path.dirname(directory), "filenames.txt")
+        if os.path.isfile(filenames_path):
+            with open(filenames_path, mode="r") as file:
+                filenames = file.read().splitlines()
+            import_svgs([os.path.join(os.path.dirname(directory), filename) for filename in filenames if filename])
+        else:
+            import_svg(directory)
 
 
         return {"FINISHED"}
@@ -44,40 +47,375 @@ def unregister():
     
     
 
+# registering only, the file dialog is opened from the operator search (Import PCB Folder)
 if __name__ == "__main__":
     register()
-    bpy.ops.pcb.import_svg("INVOKE_DEFAULT")
     
 
 
 
 
+##
+# the scale bpy.ops.import_curve.svg applies to svg user units \(90 dpi to meters\)
+SVG_SCALE = 1.0 / 90.0 * 0.3048 / 12.0
+
+##
+# the scale applied to the imported layer so 1 meter in blender equals 1 millimeter in the real world
+LAYER_SCALE = 2814.5
+
+##
+# number of straight segments each cubic bezier is flattened into
+BEZIER_SEGMENTS = 8
+
+##
+# tokens of the path data: a command letter or a number
+PATH_TOKEN = re.compile(r"[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+
+
+##
+# Brings in the SVG file as a single mesh built directly from the path data, skipping the curve objects created by bpy.ops.import_curve.svg\n
+# Falls back to import_svg_curves for files the path reader does not handle
+# @param dir -the directory where the files are located
+def import_svg(dir):
+    import_svgs([dir])
+
+
+
+
+##
+# Brings in several SVG files, the path data of all files is read on a thread pool and only the meshes are created on the main thread
+# @param paths -list of the SVG file paths
+def import_svgs(paths):
+    # the curve import scales documents with physical units by the scene unit scale, read it here on the main thread
+    scale_length = bpy.context.scene.unit_settings.scale_length
+    with ThreadPoolExecutor() as executor:
+        parsed = list(executor.map(lambda path: try_read_svg_paths(path, scale_length), paths))
+
+    for path, data in zip(paths, parsed):
+        if data is None:
+            import_svg_curves(path)
+        else:
+            create_layer(os.path.basename(path)[0:-4], *data)
+
+
+
+
+##
+# Reads the path data of an SVG file without touching bpy, so it is safe to run off the main thread
+# @param filepath -the SVG file
+# @param scale_length -the unit scale of the scene
+# @return the result of read_svg_paths, or None when the file needs import_curve.svg
+def try_read_svg_paths(filepath, scale_length):
+    try:
+        return read_svg_paths(filepath, scale_length)
+    except (ValueError, KeyError, ET.ParseError) as e:
+        print("reading the svg paths failed, using import_curve.svg: " + str(e))
+        return None
+
+
+
+
+##
+# Creates the layer object from the mesh data and puts it in the layers collection
+# @param name -the name of the layer
+# @param verts -the vertex coordinates
+# @param edges -the edges of the open sub paths
+# @param faces -the faces of the closed sub paths
+# @param svg_unit -the size of one svg user unit on the layer, extrude_single_layer merges vertices within half of it
+def create_layer(name, verts, edges, faces, svg_unit):
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, edges, faces)
+    mesh.update()
+    layer = bpy.data.objects.new(name, mesh)
+    layer["svg_unit"] = svg_unit
+    col = bpy.data.collections.get("layers")
+    if col is None:
+        col = bpy.data.collections.new("layers")
+        bpy.context.scene.collection.children.link(col)
+    col.objects.link(layer)
+
+
+
+
+##
+# Parses an svg length the way the curve import does, converting physical units to user units
+# @param value -the attribute value
+# @param size -the size a percentage refers to
+# @return the length in user units
+def parse_svg_length(value, size):
+    token, last_char = read_float(value)
+    unit = value[last_char:].strip()
+    if unit == "%":
+        return float(size) / 100.0 * float(token)
+    # an unknown unit raises KeyError and the file goes through the curve import
+    return float(token) * units[unit]
+
+
+
+
+##
+# Builds the mapping from the path coordinates to svg user units that the curve import applies for the root <svg> element\n
+# Follows SVGMatrixFromNode and SVGGeometrySVG of io_curve_svg, including the shift of the origin to the bottom of the viewBox
+# @param elem -the root <svg> element
+# @param scale_length -the unit scale of the scene
+# @return a tuple of the scale and the (x, y) offset, the user unit coordinates are path coordinates * scale + offset
+def svg_root_transform(elem, scale_length):
+    import numpy as np
+
+    view_box = elem.get("viewBox")
+    if not view_box:
+        return 1.0, np.zeros(2)
+
+    width = parse_svg_length(elem.get("width") or "0", 0)
+    height = parse_svg_length(elem.get("height") or "0", 0)
+    vx, vy, vw, vh = (parse_svg_length(value, 0) for value in view_box.replace(",", " ").split())
+    if vw == 0 or vh == 0:
+        return 1.0, np.zeros(2)
+
+    if width != 0 and height != 0:
+        scale = min(width / vw, height / vh)
+    else:
+        scale = 1.0
+        width = vw
+        height = vh
+    offset = np.array([(width - vw * scale) / 2 - vx, (height - vh * scale) / 2 - vy])
+
+    # documents with a physical height are converted to blender units
+    raw_height = elem.get("height") or ""
+    unit = raw_height[read_float(raw_height)[1]:].strip() if raw_height else ""
+    if unit in ("cm", "mm", "in", "pt", "pc"):
+        scale *= units[unit] / 90 * 1000 / 39.3701 / scale_length
+
+    # the origin moves to the bottom of the viewBox before the scale
+    offset = offset + scale * np.array([0.0, -vy - vh])
+    return scale, offset
+
+
+
+
+##
+# Finds the pairs of bounding boxes that overlap, by sorting on xmin and sweeping, so the cost follows the number of overlaps instead of every pair\n
+# Boxes that only touch count as overlapping
+# @param bounds -(n, 4) array of xmin, ymin, xmax, ymax
+# @return two index arrays, the first and second box of every overlapping pair
+def overlapping_bounds(bounds):
+    import numpy as np
+
+    count = len(bounds)
+    order = np.argsort(bounds[:, 0], kind="stable")
+    ordered = bounds[order]
+    # every box after box i whose xmin is not past the xmax of box i overlaps it in x
+    ends = np.searchsorted(ordered[:, 0], ordered[:, 2], side="right")
+    spans = ends - np.arange(count) - 1
+    first = np.repeat(np.arange(count), spans)
+    starts = np.cumsum(spans) - spans
+    second = first + 1 + np.arange(len(first)) - np.repeat(starts, spans)
+    # keep the pairs that also overlap in y
+    in_y = (ordered[first, 1] <= ordered[second, 3]) & (ordered[second, 1] <= ordered[first, 3])
+    return order[first[in_y]], order[second[in_y]]
+
+
+
+
+##
+# Tells whether a point is inside a polygon with even-odd ray casting
+# @param point -the (x, y) point
+# @param polygon -(n, 2) array of the polygon vertices
+# @return True when the point is inside
+def point_in_polygon(point, polygon):
+    import numpy as np
+
+    x, y = polygon[:, 0], polygon[:, 1]
+    next_x, next_y = np.roll(x, -1), np.roll(y, -1)
+    crosses = (y > point[1]) != (next_y > point[1])
+    dy = np.where(next_y == y, 1.0, next_y - y)
+    x_cross = x + (point[1] - y) * (next_x - x) / dy
+    return np.count_nonzero(crosses & (point[0] < x_cross)) % 2 == 1
+
+
+
+
+##
+# Tells whether the edges of two polygons properly cross, edges that only touch or run along each other do not count
+# @param a -(n, 2) array of the first polygon vertices
+# @param b -(m, 2) array of the second polygon vertices
+# @return True when an edge of a crosses an edge of b
+def polygon_edges_cross(a, b):
+    import numpy as np
+
+    a0, a1 = a[:, None, :], np.roll(a, -1, axis=0)[:, None, :]
+    b0, b1 = b[None, :, :], np.roll(b, -1, axis=0)[None, :, :]
+
+    def side(p, q, r):
+        return (q[..., 0] - p[..., 0]) * (r[..., 1] - p[..., 1]) - (q[..., 1] - p[..., 1]) * (r[..., 0] - p[..., 0])
+
+    return bool(np.any((side(a0, a1, b0) * side(a0, a1, b1) < 0) & (side(b0, b1, a0) * side(b0, b1, a1) < 0)))
+
+
+
+
+##
+# Tells whether any closed sub path lies inside or overlaps another one, such as the hole of a pad ring\n
+# Those need the even-odd fill of the curve import, one ngon per sub path would fill the holes\n
+# Only the sub paths whose bounding boxes overlap are tested, so boards with many separate pads stay close to linear
+# @param polygons -the closed sub paths as (n, 2) arrays
+# @return True when one sub path is inside another or their edges cross
+def has_nested_polygons(polygons):
+    import numpy as np
+
+    if len(polygons) < 2:
+        return False
+    bounds = np.array([np.concatenate([polygon.min(axis=0), polygon.max(axis=0)]) for polygon in polygons])
+    for first, second in zip(*overlapping_bounds(bounds)):
+        a, b = polygons[first], polygons[second]
+        # one vertex decides containment, crossing edges catch sub paths that only overlap
+        if point_in_polygon(b[0], a) or point_in_polygon(a[0], b) or polygon_edges_cross(a, b):
+            return True
+    return False
+
+
+
+
+##
+# Reads the closed and open sub paths of every <path> element into mesh data, with the same viewBox mapping, y flip and scale as the curve import\n
+# Raises ValueError for svg content that is not handled here: transforms, shapes other than paths, path commands other than M, L, H, V, C and Z,
+# and closed sub paths inside other ones, which need the even-odd fill of the curve import
+# @param filepath -the SVG file
+# @param scale_length -the unit scale of the scene
+# @return a tuple of the vertex coordinates, the edges of open sub paths, the faces of closed sub paths and the size of one svg user unit on the layer
+def read_svg_paths(filepath, scale_length=1.0):
+    import numpy as np
+
+    t = np.linspace(0.0, 1.0, BEZIER_SEGMENTS + 1)[1:, None]
+    points = []
+    edges = []
+    faces = []
+    closed_polygons = []
+    viewport = None
+
+    def finish(polygon, closed):
+        if closed and len(polygon) > 1 and np.allclose(polygon[0], polygon[-1]):
+            polygon = polygon[:-1]
+        first = len(points)
+        if closed and len(polygon) >= 3:
+            faces.append(list(range(first, first + len(polygon))))
+            points.extend(polygon)
+            closed_polygons.append(np.array(polygon))
+        elif len(polygon) >= 2:
+            edges.extend((index, index + 1) for index in range(first, first + len(polygon) - 1))
+            points.extend(polygon)
+
+    for _, elem in ET.iterparse(filepath, events=("start",)):
+        tag = elem.tag.rsplit("}", 1)[-1]
+        if "transform" in elem.attrib:
+            raise ValueError("transformed content in " + tag)
+        if tag == "svg":
+            # nested svg elements have their own viewport
+            if viewport is not None:
+                raise ValueError("nested svg element")
+            viewport = svg_root_transform(elem, scale_length)
+            continue
+        if tag in ("circle", "ellipse", "rect", "line", "polyline", "polygon", "use"):
+            raise ValueError("unsupported element " + tag)
+        if tag != "path":
+            continue
+
+        tokens = PATH_TOKEN.findall(elem.get("d", ""))
+        numbers = []
+        command = None
+        current = np.zeros(2)
+        start = current
+        polygon = []
+        i = 0
+        while i < len(tokens):
+            if tokens[i].isalpha():
+                command = tokens[i]
+                i += 1
+                if command in "Zz":
+                    finish(polygon, True)
+                    # a sub path drawn after a closepath without a moveto starts at the start of the closed one
+                    current = start
+                    polygon = [start]
+                    continue
+            elif command is None or command in "Zz":
+                raise ValueError("malformed path data")
+
+            upper = command.upper()
+            count = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6}.get(upper)
+            if count is None:
+                raise ValueError("unsupported path command " + command)
+            numbers = [float(token) for token in tokens[i:i + count]]
+            if len(numbers) != count:
+                raise ValueError("malformed path data")
+            i += count
+            offset = current if command.islower() else np.zeros(2)
+
+            if upper == "M":
+                finish(polygon, False)
+                current = offset + numbers
+                start = current
+                polygon = [current]
+                # further coordinate pairs after a moveto are linetos
+                command = "l" if command.islower() else "L"
+            elif upper == "L":
+                current = offset + numbers
+                polygon.append(current)
+            elif upper == "H":
+                current = np.array([offset[0] + numbers[0], current[1]])
+                polygon.append(current)
+            elif upper == "V":
+                current = np.array([current[0], offset[1] + numbers[0]])
+                polygon.append(current)
+            else:
+                p1, p2, p3 = (offset + numbers[0:2], offset + numbers[2:4], offset + numbers[4:6])
+                curve = (1 - t) ** 3 * current + 3 * (1 - t) ** 2 * t * p1 + 3 * (1 - t) * t ** 2 * p2 + t ** 3 * p3
+                polygon.extend(curve)
+                current = p3
+        finish(polygon, False)
+
+    if not points:
+        raise ValueError("no path data")
+    if has_nested_polygons(closed_polygons):
+        raise ValueError("closed sub paths with holes")
+    view_scale, view_offset = viewport if viewport is not None else (1.0, np.zeros(2))
+    verts = np.zeros((len(points), 3))
+    verts[:, :2] = (np.array(points) * view_scale + view_offset) * (SVG_SCALE * LAYER_SCALE)
+    verts[:, 1] *= -1
+    return verts, edges, faces, view_scale * SVG_SCALE * LAYER_SCALE
+
+
+
+
 ##
 # Brings in the SVG file, applies the x and y orientation, converts the curves to meshes, scales it to 1 meter in blender equals 1 millimeter in the real world, and places the objects into a collection ... \(still to come: extrusions, height placement, cut the holes, and join a copy into a completed version\)\n
 # Uses Blender 2.8.2 or higher API
 # @param dir -the directory where the files are located
 # @param file -the lisa of SVG files representing the Gerber Files / PCB
-def import_svg(dir):
+def import_svg_curves(dir):
     bpy.ops.import_curve.svg(filepath=(dir))
-    cut = dir.rindex("\\")
-    file = dir[cut + 1: len(dir)] 
+    file = os.path.basename(dir)
 
     col = bpy.data.collections.get(file)
-    if col:
+    if col and len(col.objects) > 0:
         for obj in col.objects:    
             obj.select_set(True)
-            bpy.context.view_layer.objects.active = obj
-            obj.to_mesh(preserve_all_data_layers=True)
-
-       
+        bpy.context.view_layer.objects.active = col.objects[0]
 
-    
+    # convert every curve of the file in one go and join them once
+    bpy.ops.object.convert(target="MESH") 
     bpy.ops.object.join()
     layer = bpy.context.selected_objects[0]
     layer.name = file[0:-4]
-    layer.scale = (2814.5, 2814.5, 2814.5)
-    bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
-    bpy.ops.object.convert(target="MESH") 
+    try:
+        root = ET.parse(dir).getroot()
+        layer["svg_unit"] = svg_root_transform(root, bpy.context.scene.unit_settings.scale_length)[0] * SVG_SCALE * LAYER_SCALE
+    except (ValueError, KeyError, ET.ParseError) as e:
+        print("reading the svg unit failed, keeping the default merge distance: " + str(e))
+    # bake the scale straight into the data, the same result as transform_apply without the scene update
+    layer.data.transform(Matrix.LocRotScale(layer.location, layer.rotation_euler, (LAYER_SCALE, LAYER_SCALE, LAYER_SCALE)))
+    layer.matrix_basis = Matrix.Identity(4)
 
     
     if "layers" not in bpy.data.collections:
@@ -1,30 +1,49 @@
 import bpy
+import bmesh
+from mathutils import Vector
 
 
 
 ##
-# Duplicates all component layers in the pcb and joins them into a single object. It then moves this object out of the layers collection and into the primary collection. The single board is placed at the origin with a geometry-centralized local origin and the layered board is moved off to the side
+# Duplicates all component layers in the pcb and joins them into a single object. It then moves this object out of the layers collection and into the primary collection. The single board is placed at the origin with a geometry-centralized local origin and the layered board is moved off to the side\n
+# The layer meshes are merged in one bmesh with their transforms baked in, so no duplicate objects or join operator are needed
 def harden():
     revealAll()
 
-    for area in bpy.context.screen.areas: 
-        if area.type == "VIEW_3D":
-            for space in area.spaces: 
-                if space.type == "VIEW_3D":
-                    space.shading.type = "SOLID"
-
-    bpy.ops.object.select_all(action="SELECT")
-    bpy.ops.object.duplicate_move()
-    bpy.ops.object.join()
-    bpy.ops.object.origin_set(type="ORIGIN_GEOMETRY", center="MEDIAN")
-    board = bpy.context.selected_objects[0]
-    board.name = "PCB"
+    layers = [layer for layer in bpy.data.objects if layer.type == "MESH" and layer.name != "drill_holes"]
+    mesh = bpy.data.meshes.new("PCB")
+    bm = bmesh.new()
+    for layer in layers:
+        temp = layer.data.copy()
+        temp.transform(layer.matrix_world)
+        face_start = len(bm.faces)
+        # from_mesh appends to the geometry already in the bmesh
+        bm.from_mesh(temp)
+        bpy.data.meshes.remove(temp)
+
+        # remap the material slots of the layer onto the slots of the board
+        slots = []
+        for material in layer.data.materials:
+            if material not in mesh.materials[:]:
+                mesh.materials.append(material)
+            slots.append(mesh.materials[:].index(material))
+        if slots:
+            bm.faces.ensure_lookup_table()
+            for face in bm.faces[face_start:]:
+                face.material_index = slots[min(face.material_index, len(slots) - 1)]
+
+    # geometry-centralized origin, the same as origin_set(type="ORIGIN_GEOMETRY", center="MEDIAN")
+    if bm.verts:
+        median = sum((vert.co for vert in bm.verts), Vector()) / len(bm.verts)
+        bmesh.ops.translate(bm, vec=-median, verts=bm.verts[:])
+    bm.to_mesh(mesh)
+    bm.free()
+
+    board = bpy.data.objects.new("PCB", mesh)
     bpy.data.collections["Collection"].objects.link(board)
     board.location = (0, 0, 0)
-    bpy.ops.collection.objects_remove_active(collection="layers")
-    for layer in bpy.data.objects:
-        if layer.name != "PCB":
-            layer.location.x += 100
+    for layer in layers:
+        layer.location.x += 100
 
 
 
@@ -33,11 +52,10 @@ def harden():
 # Turns on all objects which are part of the PCB, this excludes the drill_holes tool object
 def revealAll():
     for layer in bpy.data.objects:
-        layer.select_set(False)
-        if layer.name == "drill_holes":
-            layer.hide_set(True)
-        else:
-            layer.hide_set(False)
+        hide = layer.name == "drill_holes"
+        # only touch objects whose visibility actually changes, every hide_set tags the depsgraph
+        if layer.hide_get() != hide:
+            layer.hide_set(hide)
 
 
 
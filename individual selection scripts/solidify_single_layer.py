@@ -1,4 +1,5 @@
 import bpy
+import bmesh
 
 
 ##
@@ -6,20 +7,23 @@ import bpy
 # @param layer -string name of the layer of the board to apply modifier to
 # @param thickness -the width of the trace in the design
 def solidify(layer_name, thickness):
-    for area in bpy.context.screen.areas: 
-        if area.type == "VIEW_3D":
-            for space in area.spaces: 
-                if space.type == "VIEW_3D":
-                    space.shading.type = "SOLID"
-
     layer = bpy.data.objects[layer_name]
-    modifier = layer.modifiers.new(name="Solidify", type="SOLIDIFY")
-    modifier.thickness = thickness
-    bpy.context.view_layer.objects.active = layer
-    bpy.ops.object.modifier_apply(apply_as="DATA", modifier="Solidify")
+    # solidify the mesh in place, no modifier to add and apply
+    bm = bmesh.new()
+    bm.from_mesh(layer.data)
+    bmesh.ops.solidify(bm, geom=bm.faces[:], thickness=thickness)
+    bm.to_mesh(layer.data)
+    bm.free()
+    layer.data.update()
+
 
 
 
+for area in bpy.context.screen.areas: 
+    if area.type == "VIEW_3D":
+        for space in area.spaces: 
+            if space.type == "VIEW_3D":
+                space.shading.type = "SOLID"
 
 layer = bpy.context.selected_objects[0]
 solidify(layer.name, 0.254)
@@ -1,7 +1,10 @@
 import bpy
+import bmesh
 import math
+from mathutils import Matrix
 from ..utils.scene import clear_scene
 from ..utils.material import create_material
+from ..utils.mesh import create_cylinder_mesh, create_cylinders_mesh, create_mesh_object, create_object, get_torus_mesh, join_objects
 
 # 根据图片说明修正蜂鸣器9042的尺寸
 dimensions = {
@@ -30,33 +33,12 @@ dimensions = {
     'chamfer_segments': 4,
 }
 
-def apply_all_modifiers(obj=None):
-    """应用所有修改器"""
-    if bpy.context.mode != 'OBJECT':
-        bpy.ops.object.mode_set(mode='OBJECT')
-    
-    if obj:
-        objects = [obj]
-    else:
-        objects = bpy.context.scene.objects
-    
-    for obj in objects:
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-        
-        for modifier in list(obj.modifiers):
-            try:
-                bpy.ops.object.modifier_apply(modifier=modifier.name)
-            except:
-                obj.modifiers.remove(modifier)
-
 def create_buzzer_9042_model():
     """创建蜂鸣器9042完整模型"""
     # 创建蜂鸣器主体
     body = create_buzzer_body()
     
-    # 创建2个引脚
+    # 创建2个引脚，合并为一个物体
     pins = create_pins()
     
     # 创建顶部中心发声孔
@@ -65,19 +47,13 @@ def create_buzzer_9042_model():
     # 创建十字正极标记
     marker = create_cross_marker(body)
     
-    # 确保所有修改器都被应用
-    apply_all_modifiers()
-
     # 将所有对象合并
-    bpy.ops.object.select_all(action='DESELECT')
-    body.select_set(True)
-    marker.select_set(True)
-    for obj in pins:
-        obj.select_set(True)
-    bpy.context.view_layer.objects.active = body
-    bpy.ops.object.join()
+    join_objects(body, [marker] + pins)
     body.name = "Buzzer_9042"
     
+    # 以上都是直接写数据，最后统一更新一次视图层
+    bpy.context.view_layer.update()
+    
     return body
 
 def create_buzzer_body():
@@ -86,24 +62,23 @@ def create_buzzer_body():
     height = dimensions['height']
     
     # 创建圆柱体
-    bpy.ops.mesh.primitive_cylinder_add(
-        vertices=32,
-        radius=diameter/2,
-        depth=height,
-        location=(0, 0, height/2)  # 将主体放在z轴中心
+    mesh = create_cylinder_mesh("Buzzer_9042_Body", 32, diameter/2, height)
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    
+    # 直接在bmesh中倒角，和角度限制为30度的倒角修改器一样只处理端面的边
+    bmesh.ops.bevel(
+        bm,
+        geom=[e for e in bm.edges if e.is_manifold and e.calc_face_angle(0) > math.radians(30)],
+        offset=dimensions['chamfer_size'],
+        segments=dimensions['chamfer_segments'],
+        profile=0.5,
+        affect='EDGES',
+        clamp_overlap=True
     )
-    body = bpy.context.active_object
-    body.name = "Buzzer_9042_Body"
-    
-    # 添加倒角修改器
-    bevel_mod = body.modifiers.new(name="Bevel", type='BEVEL')
-    bevel_mod.width = dimensions['chamfer_size']
-    bevel_mod.segments = dimensions['chamfer_segments']
-    bevel_mod.limit_method = 'ANGLE'
-    bevel_mod.angle_limit = math.radians(30)
-    
-    # 应用修改器
-    apply_all_modifiers(body)
+    bm.to_mesh(mesh)
+    bm.free()
+    body = create_object("Buzzer_9042_Body", mesh, location=(0, 0, height/2))  # 将主体放在z轴中心
     
     # 设置材质
     body.data.materials.clear()
@@ -113,83 +88,60 @@ def create_buzzer_body():
     return body
 
 def create_sound_hole(body):
-    """在蜂鸣器顶部创建中心发声孔"""
+    """在蜂鸣器顶部创建中心发声孔，直接在主体网格上内插并向下挤出，不使用布尔修改器"""
     hole_diameter = dimensions['hole_diameter']
     hole_depth = dimensions['hole_depth']
-    body_height = dimensions['height']
     
-    # 创建圆柱体作为切割工具
-    bpy.ops.mesh.primitive_cylinder_add(
-        vertices=16,
-        radius=hole_diameter/2,
-        depth=hole_depth + 0.1,  # 稍微超出深度
-        location=(0, 0, body_height - hole_depth/2)  # 从顶部向下
-    )
-    hole_cutter = bpy.context.active_object
-    hole_cutter.name = "Sound_Hole_Cutter"
-    
-    # 为蜂鸣器主体添加布尔修改器
-    bool_mod = body.modifiers.new(name="Sound_Hole", type='BOOLEAN')
-    bool_mod.operation = 'DIFFERENCE'
-    bool_mod.object = hole_cutter
-    
-    # 应用布尔修改器
-    bpy.ops.object.select_all(action='DESELECT')
-    body.select_set(True)
-    bpy.context.view_layer.objects.active = body
-    bpy.ops.object.modifier_apply(modifier=bool_mod.name)
-    
-    # 删除切割工具
-    bpy.ops.object.select_all(action='DESELECT')
-    hole_cutter.select_set(True)
-    bpy.ops.object.delete(use_global=False)
+    bm = bmesh.new()
+    bm.from_mesh(body.data)
+    
+    # 找到顶部端面
+    top_faces = [f for f in bm.faces if f.normal.z > 0.9]
+    if not top_faces:
+        bm.free()
+        return
+    top = max(top_faces, key=lambda f: f.calc_center_median().z)
+    center = top.calc_center_median()
+    
+    # 内插出孔的轮廓，再把内侧顶点放到孔的半径上
+    bmesh.ops.inset_individual(bm, faces=[top], thickness=hole_diameter/4)
+    for vert in top.verts:
+        offset = vert.co - center
+        offset.z = 0
+        if offset.length > 0:
+            vert.co.xy = (center + offset.normalized() * hole_diameter/2).xy
+    
+    # 向下挤出形成盲孔
+    extruded = bmesh.ops.extrude_face_region(bm, geom=[top])
+    hole_verts = [elem for elem in extruded['geom'] if isinstance(elem, bmesh.types.BMVert)]
+    bmesh.ops.translate(bm, vec=(0, 0, -hole_depth), verts=hole_verts)
+    if top.is_valid:
+        bmesh.ops.delete(bm, geom=[top], context='FACES_ONLY')
+    bmesh.ops.recalc_face_normals(bm, faces=bm.faces[:])
+    
+    bm.to_mesh(body.data)
+    bm.free()
+    body.data.update()
 
 def create_pins():
-    """创建2个金属引脚"""
-    pins = []
-    
-    # 引脚间距
+    """创建2个金属引脚，两个引脚写入同一个网格"""
+    # 引脚尺寸
     pin_spacing = dimensions['pin_spacing']
-    body_height = dimensions['height']
-    
-    # 创建下方引脚
-    pin_bottom = create_single_pin(
-        y_pos=-pin_spacing/2,
-        pin_number=1
-    )
-    pins.append(pin_bottom)
-    
-    # 创建上方引脚
-    pin_top = create_single_pin(
-        y_pos=pin_spacing/2,
-        pin_number=2
-    )
-    pins.append(pin_top)
+    pin_radius = dimensions['pin_diameter'] / 2
     
-    return pins
-
-def create_single_pin(y_pos, pin_number):
-    """创建单个引脚"""
-    # 引脚尺寸
-    pin_diameter = dimensions['pin_diameter']
-    pin_length = dimensions[f'pin_{pin_number}_length']
-    
-    # 创建引脚圆柱体
-    bpy.ops.mesh.primitive_cylinder_add(
-        vertices=12,
-        radius=pin_diameter/2,
-        depth=pin_length,
-        location=(0, y_pos, -pin_length/2)  # 从底部中心开始
-    )
-    pin = bpy.context.active_object
-    pin.name = f"Pin_{pin_number}"
+    # 下方为引脚1，上方为引脚2，都从底部中心向下延伸
+    cylinders = []
+    for pin_number, y_pos in ((1, -pin_spacing/2), (2, pin_spacing/2)):
+        pin_length = dimensions[f'pin_{pin_number}_length']
+        cylinders.append((12, pin_radius, pin_length, (0, y_pos, -pin_length/2)))
+    mesh = create_cylinders_mesh("Pins", cylinders)
+    pins = create_object("Pins", mesh)
     
     # 设置材质
-    pin.data.materials.clear()
     mat_pin = create_material(name="Metal_Silver", base_color = (0.85, 0.85, 0.88, 1.0), metallic = 0.9, roughness = 0.3)
-    pin.data.materials.append(mat_pin)
+    pins.data.materials.append(mat_pin)
     
-    return pin
+    return [pins]
 
 def create_cross_marker(body):
     """在蜂鸣器顶部创建凸起的十字正极标记"""
@@ -204,52 +156,20 @@ def create_cross_marker(body):
     marker_y = cross_offset
     marker_z = body_height  # 在顶部表面上
     
-    # 创建水平条
-    bpy.ops.mesh.primitive_cube_add(
-        size=1,
-        location=(marker_x, marker_y, marker_z + cross_height/2)
-    )
-    cross_h = bpy.context.active_object
-    cross_h.name = "Cross_Marker_Horizontal"
-    
-    # 设置水平条尺寸
-    cross_h.scale = (cross_width, cross_thickness, cross_height)
-    bpy.ops.object.transform_apply(scale=True)
-    
-    # 创建垂直条
-    bpy.ops.mesh.primitive_cube_add(
-        size=1,
-        location=(marker_x, marker_y, marker_z + cross_height/2)
-    )
-    cross_v = bpy.context.active_object
-    cross_v.name = "Cross_Marker_Vertical"
-    
-    # 设置垂直条尺寸
-    cross_v.scale = (cross_thickness, cross_width, cross_height)
-    bpy.ops.object.transform_apply(scale=True)
-
-    # 创建圆环
-    bpy.ops.mesh.primitive_torus_add(
-        # align='WORLD',          # 对齐方式
-        location=(marker_x, marker_y, marker_z + cross_height/2),
+    # 十字的两条和圆环直接生成在同一个bmesh中
+    bm = bmesh.new()
+    # 水平条
+    bmesh.ops.create_cube(bm, size=1.0, matrix=Matrix.Diagonal((cross_width, cross_thickness, cross_height, 1.0)))
+    # 垂直条
+    bmesh.ops.create_cube(bm, size=1.0, matrix=Matrix.Diagonal((cross_thickness, cross_width, cross_height, 1.0)))
+    # 圆环，模板网格只生成一次，追加到bmesh中
+    bm.from_mesh(get_torus_mesh(
         major_radius=cross_width/2 + 0.15,
         minor_radius=cross_thickness/2,
         major_segments=48,
         minor_segments=16,
-    )
-    cross_circle = bpy.context.active_object
-    cross_circle.name = "Cross_Marker_Circle"
-    
-    # 合并十字标记的两部分
-    bpy.ops.object.select_all(action='DESELECT')
-    cross_h.select_set(True)
-    cross_v.select_set(True)
-    cross_circle.select_set(True)
-    bpy.context.view_layer.objects.active = cross_h
-    bpy.ops.object.join()
-    
-    # 重命名合并后的对象
-    cross_h.name = "Cross_Positive_Marker"
+    ))
+    cross_h = create_mesh_object("Cross_Positive_Marker", bm, location=(marker_x, marker_y, marker_z + cross_height/2))
     
     # 设置十字标记材质
     cross_h.data.materials.clear()
@@ -275,11 +195,6 @@ def create_collection_and_organize(body, pins, marker):
             bpy.context.scene.collection.objects.unlink(obj)
         collection.objects.link(obj)
     
-    # 选择所有对象
-    bpy.ops.object.select_all(action='DESELECT')
-    for obj in objects_to_move:
-        obj.select_set(True)
-    
     return collection
 
 def main():
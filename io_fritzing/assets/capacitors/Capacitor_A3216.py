@@ -1,20 +1,21 @@
 import bpy
-import bmesh
-from mathutils import Vector, Matrix
+import numpy as np
 import math
 
-# 清理默认场景
-bpy.ops.object.select_all(action='SELECT')
-bpy.ops.object.delete(use_global=False, confirm=False)
+def _clear_scene():
+    """清理默认场景，只在直接运行脚本时调用，避免导入模块时删除用户的场景"""
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
 
-# 获取当前场景
-scene = bpy.context.scene
-# 设置单位系统为公制
-scene.unit_settings.system = 'METRIC'
-# 设置长度单位为毫米
-scene.unit_settings.length_unit = 'MILLIMETERS'
-# 确保缩放比例为 1（1米 = 1000毫米）
-scene.unit_settings.scale_length = 0.001
+    # 单位设置是场景全局的，已经是毫米时不再修改，避免重复刷新界面
+    unit_settings = bpy.context.scene.unit_settings
+    if unit_settings.length_unit != 'MILLIMETERS' or not math.isclose(unit_settings.scale_length, 0.001, rel_tol=1e-6):
+        # 设置单位系统为公制
+        unit_settings.system = 'METRIC'
+        # 设置长度单位为毫米
+        unit_settings.length_unit = 'MILLIMETERS'
+        # 确保缩放比例为 1（1米 = 1000毫米）
+        unit_settings.scale_length = 0.001
 
 # 定义常见贴片钽电容封装尺寸（单位：毫米）
 TANTALUM_SIZES = {
@@ -26,41 +27,113 @@ TANTALUM_SIZES = {
     'V7343': {'length': 7.3, 'width': 4.3, 'height': 2.5, 'terminal_width': 3.1, 'extension_length': 1.4}
 }
 
-def create_tantalum_material(name, base_color, metallic=0.0, roughness=0.8):
-    """创建钽电容材质"""
-    mat = bpy.data.materials.new(name=name)
+# 单位立方体的顶点和面，顶点按x、y、z的二进制位排列，中心在原点，面的法线朝外
+UNIT_CUBE_VERTS = np.array([(x - 0.5, y - 0.5, z - 0.5) for z in (0, 1) for y in (0, 1) for x in (0, 1)], dtype=np.float32)
+UNIT_CUBE_FACES = np.array([(0, 2, 3, 1), (4, 5, 7, 6), (0, 1, 5, 4), (2, 6, 7, 3), (0, 4, 6, 2), (1, 3, 7, 5)], dtype=np.int32)
+
+def make_boxes_mesh(name, boxes):
+    """
+    用numpy和foreach_set把多个长方体一次写入同一个网格，不经过bmesh
+    boxes为(size, center, material_index)的列表，material_index对应网格的材质槽
+    """
+    sizes = np.array([box[0] for box in boxes], dtype=np.float32)
+    centers = np.array([box[1] for box in boxes], dtype=np.float32)
+    verts = UNIT_CUBE_VERTS[None, :, :] * sizes[:, None, :] + centers[:, None, :]
+    faces = UNIT_CUBE_FACES[None, :, :] + (np.arange(len(boxes), dtype=np.int32) * len(UNIT_CUBE_VERTS))[:, None, None]
+    material_indices = np.repeat(np.array([box[2] for box in boxes], dtype=np.int32), len(UNIT_CUBE_FACES))
+    
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(verts.shape[0] * verts.shape[1])
+    mesh.loops.add(faces.size)
+    mesh.polygons.add(len(material_indices))
+    mesh.vertices.foreach_set("co", verts.ravel())
+    mesh.loops.foreach_set("vertex_index", faces.ravel())
+    mesh.polygons.foreach_set("loop_start", np.arange(0, faces.size, 4, dtype=np.int32))
+    mesh.polygons.foreach_set("material_index", material_indices)
+    mesh.update(calc_edges=True)
+    return mesh
+
+# 已创建材质的缓存，键为(name, base_color, metallic, roughness)
+_MAT_CACHE = {}
+
+# 只有PBR材质节点和输出节点的模板材质，名称以点开头不在界面中显示
+_TEMPLATE_MAT = None
+
+def _get_template_material():
+    """返回模板材质，第一次调用时创建"""
+    global _TEMPLATE_MAT
+    try:
+        if _TEMPLATE_MAT is not None and bpy.data.materials.get(_TEMPLATE_MAT.name) == _TEMPLATE_MAT:
+            return _TEMPLATE_MAT
+    except ReferenceError:
+        pass
+    
+    # 脚本重新运行后全局变量被重置，但之前的模板还在bpy.data中，直接复用
+    existing = bpy.data.materials.get(".Tantalum_Template")
+    if existing is not None and existing.node_tree and 'Principled BSDF' in existing.node_tree.nodes:
+        _TEMPLATE_MAT = existing
+        return existing
+    
+    mat = bpy.data.materials.new(name=".Tantalum_Template")
     mat.use_nodes = True
     
-    rgba_color = (*base_color, 1.0)
-    mat.diffuse_color = rgba_color
-    
     nodes = mat.node_tree.nodes
     nodes.clear()
     
     bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
+    bsdf.name = 'Principled BSDF'
+    output = nodes.new(type='ShaderNodeOutputMaterial')
+    mat.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
+    
+    _TEMPLATE_MAT = mat
+    return mat
+
+def create_tantalum_material(name, base_color, metallic=0.0, roughness=0.8):
+    """创建钽电容材质，同样参数的材质只创建一次"""
+    key = (name, tuple(base_color), metallic, roughness)
+    mat = _MAT_CACHE.get(key)
+    if mat is not None:
+        try:
+            # 材质可能已被删除或改名
+            if bpy.data.materials.get(mat.name) == mat:
+                return mat
+        except ReferenceError:
+            pass
+    
+    # 重新加载脚本后缓存为空，按名称复用已有材质
+    mat = bpy.data.materials.get(name)
+    if mat is not None:
+        _MAT_CACHE[key] = mat
+        return mat
+    
+    # 复制模板材质，节点树随材质一起复制，只需修改输入值
+    mat = _get_template_material().copy()
+    mat.name = name
+    
+    rgba_color = (*base_color, 1.0)
+    mat.diffuse_color = rgba_color
+    
+    bsdf = mat.node_tree.nodes['Principled BSDF']
     bsdf.inputs['Base Color'].default_value = rgba_color
     bsdf.inputs['Metallic'].default_value = metallic
     bsdf.inputs['Roughness'].default_value = roughness
     
-    output = nodes.new(type='ShaderNodeOutputMaterial')
-    mat.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
-    
+    _MAT_CACHE[key] = mat
     return mat
 
 def create_extension_fixed_tantalum_capacitor(size_name='C6032'):
     """创建延伸板长度修正的贴片钽电容3D模型"""
-    if size_name not in TANTALUM_SIZES:
+    dimensions = TANTALUM_SIZES.get(size_name)
+    if dimensions is None:
+        # 未知尺寸使用默认尺寸，物体名称也随之使用默认尺寸
         size_name = 'C6032'
-    
-    dimensions = TANTALUM_SIZES[size_name]
+        dimensions = TANTALUM_SIZES[size_name]
     length = dimensions['length']
     width = dimensions['width']
     height = dimensions['height']
     terminal_width = dimensions['terminal_width']
     extension_length = dimensions['extension_length']  # 延伸板长度从字典获取
     
-    print(f"调试信息：延伸板长度 = {extension_length}mm")  # 添加调试信息
-    
     # 焊端参数
     terminal_length = length * 0.02
     terminal_thickness = 0.1
@@ -70,132 +143,63 @@ def create_extension_fixed_tantalum_capacitor(size_name='C6032'):
     body_width = width * 0.9
     body_height = height * 0.9
     
-    # 创建集合
+    # 创建集合，物体都放进去之后再链接到场景，只触发一次依赖关系重建
     collection_name = f"Tantalum_Capacitor_{size_name}_Extension_Fixed"
     collection = bpy.data.collections.new(collection_name)
-    bpy.context.scene.collection.children.link(collection)
     
     # 创建材质
     body_mat = create_tantalum_material("Tantalum_Body", (0.6, 0.5, 0.3), metallic=0.0, roughness=0.8)
     terminal_mat = create_tantalum_material("Terminal_Metal", (0.9, 0.9, 0.92), metallic=0.9, roughness=0.2)
     marking_mat = create_tantalum_material("Polarity_Marking", (0.9, 0.9, 0.9), metallic=0.0, roughness=0.9)
     
-    # 1. 创建钽电容体
-    bm_body = bmesh.new()
-    body_size = Vector((body_length, body_width, body_height))
-    bmesh.ops.create_cube(bm_body, size=1.0)
-    for v in bm_body.verts:
-        v.co = v.co * body_size
-    
-    mesh_body = bpy.data.meshes.new("Tantalum_Body")
-    bm_body.to_mesh(mesh_body)
-    obj_body = bpy.data.objects.new("Tantalum_Body", mesh_body)
-    collection.objects.link(obj_body)
-    obj_body.data.materials.append(body_mat)
+    # 1. 钽电容体
+    body_size = (body_length, body_width, body_height)
     
-    # 2. 创建正极焊端
-    bm_positive_terminal = bmesh.new()
+    # 2. 正负极焊端
     terminal_height = body_height / 2
-    positive_terminal_size = Vector((terminal_length, terminal_width, terminal_height))
-    bmesh.ops.create_cube(bm_positive_terminal, size=1.0)
-    for v in bm_positive_terminal.verts:
-        v.co = v.co * positive_terminal_size
-        v.co.x -= (body_length + terminal_length) / 2
-        v.co.z -= (body_height / 2 - terminal_height / 2)
-    
-    mesh_positive_terminal = bpy.data.meshes.new("Positive_Terminal")
-    bm_positive_terminal.to_mesh(mesh_positive_terminal)
-    obj_positive_terminal = bpy.data.objects.new("Positive_Terminal", mesh_positive_terminal)
-    collection.objects.link(obj_positive_terminal)
-    obj_positive_terminal.data.materials.append(terminal_mat)
-    
-    # 3. 创建负极焊端
-    bm_negative_terminal = bmesh.new()
-    negative_terminal_size = Vector((terminal_length, terminal_width, terminal_height))
-    bmesh.ops.create_cube(bm_negative_terminal, size=1.0)
-    for v in bm_negative_terminal.verts:
-        v.co = v.co * negative_terminal_size
-        v.co.x += (body_length + terminal_length) / 2
-        v.co.z -= (body_height / 2 - terminal_height / 2)
-    
-    mesh_negative_terminal = bpy.data.meshes.new("Negative_Terminal")
-    bm_negative_terminal.to_mesh(mesh_negative_terminal)
-    obj_negative_terminal = bpy.data.objects.new("Negative_Terminal", mesh_negative_terminal)
-    collection.objects.link(obj_negative_terminal)
-    obj_negative_terminal.data.materials.append(terminal_mat)
-    
-    # 4. 创建极性标记
-    bm_marking = bmesh.new()
+    terminal_size = (terminal_length, terminal_width, terminal_height)
+    terminal_x = (body_length + terminal_length) / 2
+    terminal_z = -(body_height / 2 - terminal_height / 2)
+    
+    # 3. 极性标记
     marking_length = body_width * 1  # 极性标记长度
     marking_width = body_length * 0.1
     marking_height = body_height * 0.08
-    marking_size = Vector((marking_width, marking_length, marking_height))
-    bmesh.ops.create_cube(bm_marking, size=1.0)
-    for v in bm_marking.verts:
-        v.co = v.co * marking_size
-        v.co.x -= body_length * 0.5 - marking_width / 2
-        v.co.z += body_height / 2 - marking_height / 2.1
-
-    mesh_marking = bpy.data.meshes.new("Polarity_Marking")
-    bm_marking.to_mesh(mesh_marking)
-    obj_marking = bpy.data.objects.new("Polarity_Marking", mesh_marking)
-    collection.objects.link(obj_marking)
-    obj_marking.data.materials.append(marking_mat)
-    
-    # 5. 创建焊端延伸板
-    # 正极延伸板
-    bm_positive_extension = bmesh.new()
+    marking_size = (marking_width, marking_length, marking_height)
+    marking_center = (-(body_length * 0.5 - marking_width / 2), 0, body_height / 2 - marking_height / 2.1)
+    
+    # 4. 焊端延伸板，从焊端外侧边缘向电容体内侧延伸
     extension_width = terminal_width
     extension_height = terminal_thickness
-    positive_extension_size = Vector((extension_length, extension_width, extension_height))
-    bmesh.ops.create_cube(bm_positive_extension, size=1.0)
-    for v in bm_positive_extension.verts:
-        v.co = v.co * positive_extension_size
-        # 计算正极焊端左边缘位置
-        v.co.x -= body_length / 2 - extension_length / 2 + terminal_length
-        v.co.z -= (body_height / 2 + extension_height / 2)
-    
-    mesh_positive_extension = bpy.data.meshes.new("Positive_Extension")
-    bm_positive_extension.to_mesh(mesh_positive_extension)
-    obj_positive_extension = bpy.data.objects.new("Positive_Extension", mesh_positive_extension)
-    collection.objects.link(obj_positive_extension)
-    obj_positive_extension.data.materials.append(terminal_mat)
-    
-    # 负极延伸板
-    bm_negative_extension = bmesh.new()
-    negative_extension_size = Vector((extension_length, extension_width, extension_height))
-    bmesh.ops.create_cube(bm_negative_extension, size=1.0)
-    for v in bm_negative_extension.verts:
-        v.co = v.co * negative_extension_size
-        # 计算负极焊端右边缘位置
-        v.co.x += body_length / 2 - extension_length / 2 + terminal_length
-        v.co.z -= (body_height / 2 + extension_height / 2)
-
-    
-    mesh_negative_extension = bpy.data.meshes.new("Negative_Extension")
-    bm_negative_extension.to_mesh(mesh_negative_extension)
-    obj_negative_extension = bpy.data.objects.new("Negative_Extension", mesh_negative_extension)
-    collection.objects.link(obj_negative_extension)
-    obj_negative_extension.data.materials.append(terminal_mat)
-    
-    # 清理bmesh
-    bm_body.free()
-    bm_positive_terminal.free()
-    bm_negative_terminal.free()
-    bm_marking.free()
-    bm_positive_extension.free()
-    bm_negative_extension.free()
-    
-    # 选择所有对象
-    bpy.ops.object.select_all(action='DESELECT')
-    for obj in collection.objects:
-        obj.select_set(True)
+    extension_size = (extension_length, extension_width, extension_height)
+    extension_x = body_length / 2 - extension_length / 2 + terminal_length
+    extension_z = -(body_height / 2 + extension_height / 2)
+    
+    # 所有部件写入同一个网格，材质槽0为电容体，1为焊端和延伸板，2为极性标记
+    mesh_body = make_boxes_mesh(f"Tantalum_Capacitor_{size_name}", [
+        (body_size, (0, 0, 0), 0),
+        (terminal_size, (-terminal_x, 0, terminal_z), 1),
+        (terminal_size, (terminal_x, 0, terminal_z), 1),
+        (marking_size, marking_center, 2),
+        (extension_size, (-extension_x, 0, extension_z), 1),
+        (extension_size, (extension_x, 0, extension_z), 1),
+    ])
+    mesh_body.materials.append(body_mat)
+    mesh_body.materials.append(terminal_mat)
+    mesh_body.materials.append(marking_mat)
+    obj_body = bpy.data.objects.new(f"Tantalum_Capacitor_{size_name}", mesh_body)
+    collection.objects.link(obj_body)
+    bpy.context.scene.collection.children.link(collection)
     
     bpy.context.view_layer.objects.active = obj_body
     
     return collection, dimensions
 
-# 创建延伸板长度修正的A3216贴片钽电容
-collection, dimensions = create_extension_fixed_tantalum_capacitor('A3216')
+# 直接运行
+if __name__ == "__main__":
+    _clear_scene()
+
+    # 创建延伸板长度修正的A3216贴片钽电容
+    collection, dimensions = create_extension_fixed_tantalum_capacitor('A3216')
 
-print("贴片钽电容3D模型生成完毕！")
+    print("贴片钽电容3D模型生成完毕！")
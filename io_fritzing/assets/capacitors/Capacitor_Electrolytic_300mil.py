@@ -1,27 +1,219 @@
 import bpy
-import bmesh
 from mathutils import Vector
 import math
+import numpy as np
+
+# Blender自带的Python没有numba，没有安装时使用numpy广播
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 def safe_clean_scene():
     """安全地清理场景，避免上下文错误"""
+    scene = bpy.context.scene
+    
+    # 设置场景单位，单位设置是场景全局的，已经是毫米时不再修改
+    unit_settings = scene.unit_settings
+    if unit_settings.length_unit != 'MILLIMETERS' or not math.isclose(unit_settings.scale_length, 0.001, rel_tol=1e-6):
+        unit_settings.system = 'METRIC'
+        unit_settings.length_unit = 'MILLIMETERS'
+        unit_settings.scale_length = 0.001
+    
+    # 场景中没有物体时不需要清理
+    if len(scene.objects) == 0:
+        return
+    
     # 确保在对象模式下
     if bpy.context.active_object is not None:
         if bpy.context.active_object.mode != 'OBJECT':
             bpy.ops.object.mode_set(mode='OBJECT')
     
-    # 选择并删除所有对象
-    for obj in bpy.context.scene.objects:
-        obj.select_set(True)
-    
-    if bpy.context.selected_objects:
-        bpy.ops.object.delete(use_global=False)
-        
-    # 设置场景单位
-    scene = bpy.context.scene
-    scene.unit_settings.system = 'METRIC'
-    scene.unit_settings.length_unit = 'MILLIMETERS'
-    scene.unit_settings.scale_length = 0.001
+    # 一次删除所有对象，不经过选择和bpy.ops.object.delete
+    bpy.data.batch_remove(list(scene.objects))
+
+
+# 电解电容尺寸参数
+ELECTROLYTIC_SIZES = {
+    "100mil": {
+        "pin_spacing": 2.54,
+        "body_diameter": 4.5,
+        "body_height": 11.0,
+        "pin_length": 12.0,
+        "pin_diameter": 0.6,
+        "base_height": 1.0
+    },
+    "200mil": {
+        "pin_spacing": 5.08,
+        "body_diameter": 6.0,
+        "body_height": 16.0,
+        "pin_length": 15.0,
+        "pin_diameter": 0.7,
+        "base_height": 1.2
+    },
+    "300mil": {
+        "pin_spacing": 7.62,
+        "body_diameter": 8.0,
+        "body_height": 20.0,
+        "pin_length": 18.0,
+        "pin_diameter": 0.8,
+        "base_height": 1.5
+    }
+}
+
+def _make_unit_ring(segments):
+    """单位圆上的segments个点，从y轴正方向开始逆时针排列，与primitive_cylinder_add的顶点顺序相同"""
+    angles = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    return np.column_stack([-np.sin(angles), np.cos(angles)])
+
+# 预先计算的单位圆，所有圆柱共用，只需乘以半径
+_UNIT_RINGS = {segments: _make_unit_ring(segments) for segments in (16, 32)}
+
+def _unit_ring(segments):
+    """返回segments个点的单位圆，不在预先计算的表中时计算一次并保存"""
+    ring = _UNIT_RINGS.get(segments)
+    if ring is None:
+        ring = _UNIT_RINGS[segments] = _make_unit_ring(segments)
+    return ring
+
+def _cylinder_verts_numpy(ring, radius, depth):
+    """圆柱的顶点，ring为单位圆，依次为底面一圈、顶面一圈、底面中心和顶面中心"""
+    vertices = len(ring)
+    verts = np.zeros((2 * vertices + 2, 3), dtype=np.float32)
+    verts[:vertices, :2] = ring * radius
+    verts[vertices:2 * vertices, :2] = verts[:vertices, :2]
+    verts[:vertices, 2] = -depth / 2
+    verts[vertices:2 * vertices, 2] = depth / 2
+    verts[2 * vertices, 2] = -depth / 2
+    verts[2 * vertices + 1, 2] = depth / 2
+    return verts
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _cylinder_verts(ring, radius, depth):
+        """与_cylinder_verts_numpy相同，用一个循环直接填充顶点缓冲区"""
+        vertices = ring.shape[0]
+        verts = np.zeros((2 * vertices + 2, 3), dtype=np.float32)
+        for i in range(vertices):
+            x = ring[i, 0] * radius
+            y = ring[i, 1] * radius
+            verts[i, 0] = x
+            verts[i, 1] = y
+            verts[i, 2] = -depth / 2
+            verts[i + vertices, 0] = x
+            verts[i + vertices, 1] = y
+            verts[i + vertices, 2] = depth / 2
+        verts[2 * vertices, 2] = -depth / 2
+        verts[2 * vertices + 1, 2] = depth / 2
+        return verts
+else:
+    _cylinder_verts = _cylinder_verts_numpy
+
+def _make_cylinder(vertices, radius, depth):
+    """
+    计算圆柱的顶点和面，中心在原点，轴沿z方向
+    侧面为四边形，两端为以端面中心为顶点的三角扇，不需要再对n边形做三角化
+    返回(verts, loops, loop_starts)：loops为所有面依次排列的顶点索引，loop_starts为每个面在loops中的起点
+    """
+    verts = _cylinder_verts(_unit_ring(vertices), float(radius), float(depth))
+    
+    index = np.arange(vertices, dtype=np.int32)
+    following = (index + 1) % vertices
+    sides = np.column_stack([index, following, following + vertices, index + vertices])
+    # 底面三角形顺时针排列使法线朝下，顶面逆时针排列使法线朝上
+    bottom = np.column_stack([np.full(vertices, 2 * vertices, dtype=np.int32), following, index])
+    top = np.column_stack([np.full(vertices, 2 * vertices + 1, dtype=np.int32), index + vertices, following + vertices])
+    loops = np.concatenate([sides.ravel(), bottom.ravel(), top.ravel()])
+    loop_starts = np.append(np.arange(0, sides.size, 4, dtype=np.int32), sides.size + np.arange(0, 6 * vertices, 3, dtype=np.int32))
+    return verts, loops, loop_starts
+
+# 绕Z轴逆时针旋转90度的矩阵，用于直接旋转顶点
+_ROTATE_Z_90 = np.array([(0, -1, 0), (1, 0, 0), (0, 0, 1)], dtype=np.float32)
+
+def _make_stripe(vertices, radius, depth, thickness, max_x):
+    """
+    计算负极带的顶点和面：取vertices边形圆柱侧面中位于y轴正方向、面中心|x| < max_x的部分，
+    沿半径方向向内外各加厚thickness / 2，中心在原点，返回值与_make_cylinder相同
+    """
+    # 与_make_cylinder相同，第i个侧面从角度2πi/n到2π(i+1)/n，面中心在两者中间
+    step = 2 * np.pi / vertices
+    middle = (np.arange(vertices) + 0.5) * step
+    middle = np.where(middle > np.pi, middle - 2 * np.pi, middle)
+    center_radius = radius * np.cos(step / 2)
+    kept = middle[(center_radius * np.cos(middle) > 0) & (np.abs(center_radius * np.sin(middle)) < max_x)]
+    
+    # 保留的侧面围绕y轴正方向连续排列，按角度生成圆弧上的顶点
+    count = len(kept) + 1
+    angles = kept.min() - step / 2 + np.arange(count) * step
+    verts = np.empty((4 * count, 3), dtype=np.float32)
+    # 依次为外侧底部、外侧顶部、内侧底部、内侧顶部四圈
+    for ring, (ring_radius, z) in enumerate([
+        (radius + thickness / 2, -depth / 2), (radius + thickness / 2, depth / 2),
+        (radius - thickness / 2, -depth / 2), (radius - thickness / 2, depth / 2),
+    ]):
+        ring_verts = verts[ring * count:(ring + 1) * count]
+        ring_verts[:, 0] = -ring_radius * np.sin(angles)
+        ring_verts[:, 1] = ring_radius * np.cos(angles)
+        ring_verts[:, 2] = z
+    
+    index = np.arange(count - 1, dtype=np.int32)
+    outer_bottom, outer_top, inner_bottom, inner_top = (index + ring * count for ring in range(4))
+    quads = np.concatenate([
+        np.column_stack([outer_bottom, outer_bottom + 1, outer_top + 1, outer_top]),
+        np.column_stack([inner_bottom, inner_top, inner_top + 1, inner_bottom + 1]),
+        np.column_stack([outer_top, outer_top + 1, inner_top + 1, inner_top]),
+        np.column_stack([outer_bottom, inner_bottom, inner_bottom + 1, outer_bottom + 1]),
+        # 圆弧两端的端面
+        np.array([(0, count, 3 * count, 2 * count),
+                  (count - 1, 3 * count - 1, 4 * count - 1, 2 * count - 1)], dtype=np.int32),
+    ])
+    return verts, quads.ravel(), np.arange(0, quads.size, 4, dtype=np.int32)
+
+def _create_mesh(name, verts, loops, loop_starts):
+    """用foreach_set一次写入网格数据"""
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(verts))
+    mesh.loops.add(len(loops))
+    mesh.polygons.add(len(loop_starts))
+    mesh.vertices.foreach_set("co", verts.ravel())
+    mesh.loops.foreach_set("vertex_index", loops)
+    # Blender 4.x中loop_total由loop_start推出
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    mesh.update(calc_edges=True)
+    return mesh
+
+def _create_object(name, mesh, collection, location=(0, 0, 0)):
+    """用已有网格创建物体并直接链接到电容的集合，不经过bpy.ops，避免每次调用都刷新场景"""
+    obj = bpy.data.objects.new(name, mesh)
+    obj.location = location
+    collection.objects.link(obj)
+    return obj
+
+def _create_mesh_object(name, verts, loops, loop_starts, collection, location=(0, 0, 0)):
+    """创建独占网格的物体，网格之后还要修改时使用"""
+    return _create_object(name, _create_mesh(name, verts, loops, loop_starts), collection, location)
+
+# 圆柱网格的缓存，键为(vertices, radius, depth)
+_CYLINDER_MESH_CACHE = {}
+
+def get_cylinder_mesh(vertices, radius, depth):
+    """
+    返回同样尺寸的物体共用的圆柱网格，只生成一次
+    共用的网格不能再修改，需要修改时使用_create_mesh_object
+    """
+    key = (vertices, radius, depth)
+    mesh = _CYLINDER_MESH_CACHE.get(key)
+    if mesh is not None:
+        try:
+            # 网格可能已被删除
+            if bpy.data.meshes.get(mesh.name) == mesh:
+                return mesh
+        except ReferenceError:
+            pass
+    
+    mesh = _create_mesh("Cylinder", *_make_cylinder(vertices, radius, depth))
+    _CYLINDER_MESH_CACHE[key] = mesh
+    return mesh
 
 
 def create_electrolytic_capacitor(rad_type="RAD-0.2", capacitance="10uF", voltage="16V"):
@@ -32,98 +224,62 @@ def create_electrolytic_capacitor(rad_type="RAD-0.2", capacitance="10uF", voltag
     # 安全清理场景
     safe_clean_scene()
     
-    # 电解电容尺寸参数
-    dimensions = {
-        "100mil": {
-            "pin_spacing": 2.54,
-            "body_diameter": 4.5,
-            "body_height": 11.0,
-            "pin_length": 12.0,
-            "pin_diameter": 0.6,
-            "base_height": 1.0
-        },
-        "200mil": {
-            "pin_spacing": 5.08,
-            "body_diameter": 6.0,
-            "body_height": 16.0,
-            "pin_length": 15.0,
-            "pin_diameter": 0.7,
-            "base_height": 1.2
-        },
-        "300mil": {
-            "pin_spacing": 7.62,
-            "body_diameter": 8.0,
-            "body_height": 20.0,
-            "pin_length": 18.0,
-            "pin_diameter": 0.8,
-            "base_height": 1.5
-        }
-    }
-    
-    if rad_type not in dimensions:
+    if rad_type not in ELECTROLYTIC_SIZES:
         rad_type = "200mil"
     
-    dim = dimensions[rad_type]
+    dim = ELECTROLYTIC_SIZES[rad_type]
+    
+    # 先创建集合，物体创建后直接链接到这个集合
+    collection = organize_collection(rad_type)
     
     # 创建电容主体（铝壳）
-    bpy.ops.mesh.primitive_cylinder_add(
-        vertices=32,
-        radius=dim["body_diameter"] / 2,
-        depth=dim["body_height"],
+    body = _create_object(
+        f"Electrolytic_Capacitor_Body_{rad_type}", get_cylinder_mesh(32, dim["body_diameter"] / 2, dim["body_height"]), collection,
         location=(0, 0, dim["body_height"] / 2 + dim["base_height"])
     )
-    body = bpy.context.active_object
-    body.name = f"Electrolytic_Capacitor_Body_{rad_type}"
     
     # 创建底部基座
-    bpy.ops.mesh.primitive_cylinder_add(
-        vertices=32,
-        radius=dim["body_diameter"] / 2 + 0.3,
-        depth=dim["base_height"],
+    base = _create_object(
+        f"Capacitor_Base_{rad_type}", get_cylinder_mesh(32, dim["body_diameter"] / 2 + 0.3, dim["base_height"]), collection,
         location=(0, 0, dim["base_height"] / 2)
     )
-    base = bpy.context.active_object
-    base.name = f"Capacitor_Base_{rad_type}"
     
     # 创建引脚
     pin_spacing = dim["pin_spacing"] / 2
     
     # 负极引脚
-    bpy.ops.mesh.primitive_cylinder_add(
-        vertices=16,
-        radius=dim["pin_diameter"] / 2,
-        depth=dim["pin_length"],
+    pin_negative = _create_object(
+        f"Pin_Negative_{rad_type}", get_cylinder_mesh(16, dim["pin_diameter"] / 2, dim["pin_length"]), collection,
         location=(-pin_spacing, 0, -dim["pin_length"] / 2)
     )
-    pin_negative = bpy.context.active_object
-    pin_negative.name = f"Pin_Negative_{rad_type}"
     
     # 正极引脚
-    bpy.ops.mesh.primitive_cylinder_add(
-        vertices=16,
-        radius=dim["pin_diameter"] / 2,
-        depth=dim["pin_length"] * 1.2,
+    pin_positive = _create_object(
+        f"Pin_Positive_{rad_type}", get_cylinder_mesh(16, dim["pin_diameter"] / 2, dim["pin_length"] * 1.2), collection,
         location=(pin_spacing, 0, -dim["pin_length"] * 0.6)
     )
-    pin_positive = bpy.context.active_object
-    pin_positive.name = f"Pin_Positive_{rad_type}"
     
     # 创建正确贴合的负极带，与电容主体质心对齐
-    stripe = create_aligned_negative_stripe(body, dim)
+    stripe = create_aligned_negative_stripe(body, dim, collection)
     
     # 分配材质
     assign_materials(body, base, pin_negative, pin_positive, stripe, dim, rad_type)
     
-    # 组织到集合
-    all_objects = [body, base, pin_negative, pin_positive]
-    if stripe:
-        all_objects.append(stripe)
-    organize_collection(all_objects, rad_type)
+    # 所有物体都放进集合之后再把集合链接到场景
+    scene_collection = bpy.context.scene.collection
+    if scene_collection.children.get(collection.name) is None:
+        scene_collection.children.link(collection)
+    
+    # 设置活动对象
+    bpy.context.view_layer.objects.active = body
+    
+    # 所有物体都通过bpy.data创建，最后只更新一次视图层
+    bpy.context.view_layer.update()
     
     print(f"成功创建 {rad_type} 封装电解电容模型，电容值: {capacitance}，电压: {voltage}")
     return body
 
-def create_aligned_negative_stripe(body, dim):
+def create_aligned_negative_stripe(body, dim, collection):
     """创建与电容主体质心对齐的负极带"""
     body_radius = dim["body_diameter"] / 2
     body_height = dim["body_height"]
@@ -132,58 +288,14 @@ def create_aligned_negative_stripe(body, dim):
     # 计算电容主体的质心位置
     body_center_z = base_height + body_height / 2
     
-    # 创建一个薄的圆柱体作为负极带
-    bpy.ops.mesh.primitive_cylinder_add(
-        vertices=32,
-        radius=body_radius + 0.1,
-        depth=body_height,
-        location=(0, 0, body_center_z)  # 初始位置与电容主体质心对齐
-    )
-    stripe = bpy.context.active_object
-    stripe.name = "Negative_Stripe"
-    
-    # 进入编辑模式，删除不需要的部分
-    bpy.context.view_layer.objects.active = stripe
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
-    
-    # 使用bmesh进行精确操作
-    bm = bmesh.from_edit_mesh(stripe.data)
-    
-    # 删除顶部和底部面
-    bpy.ops.mesh.select_all(action='DESELECT')
-    for face in bm.faces:
-        if abs(face.normal.z) > 0.9:  # 选择顶部和底部面
-            face.select = True
-    
-    bpy.ops.mesh.delete(type='FACE')
+    # 直接生成带厚度的一段圆弧作为负极带，与原先在编辑模式中删除圆柱的其它面再实体化的结果相同
+    verts, loops, loop_starts = _make_stripe(32, body_radius + 0.1, body_height, 0.1, body_radius * 0.3)
     
-    # 删除大部分侧面，只保留一小部分作为负极带
-    bpy.ops.mesh.select_all(action='SELECT')
-    bpy.ops.mesh.select_all(action='DESELECT')
+    # 围绕Z轴逆时针旋转90度，直接旋转顶点，物体本身不带旋转
+    verts = verts @ _ROTATE_Z_90.T
     
-    # 选择Y轴正方向的面（大约45度范围）
-    for face in bm.faces:
-        center = face.calc_center_median()
-        # 计算角度，只保留Y轴正方向的面
-        if center.y > 0 and abs(center.x) < body_radius * 0.3:
-            face.select = True
-    
-    # 反选并删除
-    bpy.ops.mesh.select_all(action='INVERT')
-    bpy.ops.mesh.delete(type='FACE')
-    
-    # 退出编辑模式
-    bpy.ops.object.mode_set(mode='OBJECT')
-    
-    # 添加实体化修改器，使负极带有厚度
-    solidify = stripe.modifiers.new(name="Solidify", type='SOLIDIFY')
-    solidify.thickness = 0.1
-    solidify.offset = 0.0
-    bpy.ops.object.modifier_apply(modifier=solidify.name)
-    
-    # 围绕Z轴逆时针旋转90度
-    stripe.rotation_euler.z = math.radians(90)
+    # 初始位置与电容主体质心对齐
+    stripe = _create_mesh_object("Negative_Stripe", verts, loops, loop_starts, collection, location=(0, 0, body_center_z))
     
     # 调整位置，使其贴合电容主体表面
     # 由于已经与质心对齐，只需要向外移动半径距离
@@ -196,28 +308,69 @@ def create_aligned_negative_stripe(body, dim):
     
     return stripe
 
+# 只有PBR材质节点和输出节点的模板材质，名称以点开头不在界面中显示
+_TEMPLATE_MAT = None
+
+def _get_template_material():
+    """返回模板材质，第一次调用时创建"""
+    global _TEMPLATE_MAT
+    try:
+        if _TEMPLATE_MAT is not None and bpy.data.materials.get(_TEMPLATE_MAT.name) == _TEMPLATE_MAT:
+            return _TEMPLATE_MAT
+    except ReferenceError:
+        pass
+    
+    # 脚本重新运行后全局变量被重置，但之前的模板还在bpy.data中，直接复用
+    existing = bpy.data.materials.get(".Capacitor_Template")
+    if existing is not None and existing.node_tree and 'Principled BSDF' in existing.node_tree.nodes:
+        _TEMPLATE_MAT = existing
+        return existing
+    
+    mat = bpy.data.materials.new(name=".Capacitor_Template")
+    mat.use_nodes = True
+    
+    nodes = mat.node_tree.nodes
+    nodes.clear()
+    
+    bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
+    bsdf.name = 'Principled BSDF'
+    output = nodes.new(type='ShaderNodeOutputMaterial')
+    mat.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
+    
+    _TEMPLATE_MAT = mat
+    return mat
+
+# 已创建材质的缓存，键为(name, color, metallic, roughness)
+_MATERIAL_CACHE = {}
+
+def create_material(name, color, metallic=0.0, roughness=0.4):
+    """创建材质，同样参数的材质只创建一次，之后的电容直接复用"""
+    key = (name, tuple(color), metallic, roughness)
+    mat = _MATERIAL_CACHE.get(key)
+    if mat is not None:
+        try:
+            # 材质可能已被删除或改名
+            if bpy.data.materials.get(mat.name) == mat:
+                return mat
+        except ReferenceError:
+            pass
+    
+    # 复制模板材质，节点树随材质一起复制，只需修改输入值
+    mat = _get_template_material().copy()
+    mat.name = name
+    mat.diffuse_color = color
+    
+    bsdf = mat.node_tree.nodes['Principled BSDF']
+    bsdf.inputs['Base Color'].default_value = color
+    bsdf.inputs['Metallic'].default_value = metallic
+    bsdf.inputs['Roughness'].default_value = roughness
+    
+    _MATERIAL_CACHE[key] = mat
+    return mat
+
 def assign_materials(body, base, pin_negative, pin_positive, stripe, dim, rad_type):
     """分配材质"""
     
-    def create_material(name, color, metallic=0.0, roughness=0.4):
-        mat = bpy.data.materials.new(name=name)
-        mat.diffuse_color = color
-        mat.use_nodes = True
-        nodes = mat.node_tree.nodes
-        nodes.clear()
-        
-        bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
-        bsdf.inputs['Base Color'].default_value = color
-        bsdf.inputs['Metallic'].default_value = metallic
-        bsdf.inputs['Roughness'].default_value = roughness
-        
-        output = nodes.new(type='ShaderNodeOutputMaterial')
-        
-        links = mat.node_tree.links
-        links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
-        
-        return mat
-    
     # 修正颜色
     # 电容主体使用深灰色 (0.3, 0.3, 0.3)
     body_material = create_material("Aluminum_Body", (0.3, 0.3, 0.3, 1.0), metallic=0.1, roughness=0.6)
@@ -242,38 +395,12 @@ def assign_materials(body, base, pin_negative, pin_positive, stripe, dim, rad_ty
         else:
             stripe.data.materials[0] = stripe_material
 
-def organize_collection(objects, rad_type):
-    """组织到集合"""
+def organize_collection(rad_type):
+    """返回电容的集合，已经存在时直接使用"""
     collection_name = f"Electrolytic_Capacitor_{rad_type}"
-    
-    # 创建新集合
-    if collection_name in bpy.data.collections:
-        collection = bpy.data.collections[collection_name]
-    else:
-        collection = bpy.data.collections.new(collection_name)
-        bpy.context.scene.collection.children.link(collection)
-    
-    # 确保所有对象都在场景集合中
-    for obj in objects:
-        if obj.name not in bpy.context.scene.collection.objects:
-            bpy.context.scene.collection.objects.link(obj)
-    
-    # 将对象移动到新集合
-    for obj in objects:
-        # 如果对象在其他集合中，先移除
-        for coll in obj.users_collection:
-            coll.objects.unlink(obj)
-        # 添加到新集合
-        collection.objects.link(obj)
-    
-    # 设置活动对象
-    if objects:
-        bpy.context.view_layer.objects.active = objects[0]
+    return bpy.data.collections.get(collection_name) or bpy.data.collections.new(collection_name)
 
 # 使用示例
 if __name__ == "__main__":
     # 创建单个电解电容
     create_electrolytic_capacitor("300mil", "100uF", "25V")
-    
-    # 更新视图
-    bpy.context.view_layer.update()
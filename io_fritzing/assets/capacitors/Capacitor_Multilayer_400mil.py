@@ -1,72 +1,202 @@
 import bpy
-import bmesh
 from mathutils import Vector
 import math
+import numpy as np
+
+# Blender自带的Python没有numba，没有安装时使用numpy广播
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 def clear_scene():
     """清空场景"""
+    scene = bpy.context.scene
+    
+    # 设置场景单位，单位设置是场景全局的，已经是毫米时不再修改
+    unit_settings = scene.unit_settings
+    if unit_settings.length_unit != 'MILLIMETERS' or not math.isclose(unit_settings.scale_length, 0.001, rel_tol=1e-6):
+        unit_settings.system = 'METRIC'
+        unit_settings.length_unit = 'MILLIMETERS'
+        unit_settings.scale_length = 0.001
+    
+    # 场景中没有物体时不需要清理
+    if len(scene.objects) == 0:
+        return
+    
     # 确保在对象模式下
     if bpy.context.active_object and bpy.context.active_object.mode != 'OBJECT':
         bpy.ops.object.mode_set(mode='OBJECT')
     
-    # 选择所有对象
-    bpy.ops.object.select_all(action='SELECT')
-    
-    # 删除所有选中的对象
-    bpy.ops.object.delete(use_global=False)
+    # 一次删除所有对象，不经过选择和bpy.ops.object.delete
+    bpy.data.batch_remove(list(scene.objects))
 
-    # 设置场景单位
-    scene = bpy.context.scene
-    scene.unit_settings.system = 'METRIC'
-    scene.unit_settings.length_unit = 'MILLIMETERS'
-    scene.unit_settings.scale_length = 0.001
+
+# 封装尺寸定义 (单位: mm)
+MULTILAYER_SIZES = {
+    "100mil": {"pin_spacing": 2.54, "diameter": 6.0, "thickness": 1.5},
+    "200mil": {"pin_spacing": 5.08, "diameter": 8.0, "thickness": 2.0},
+    "300mil": {"pin_spacing": 7.62, "diameter": 10.0, "thickness": 2.5},
+    "400mil": {"pin_spacing": 10.16, "diameter": 12.0, "thickness": 3.0},
+}
+
+def _make_unit_ring(segments):
+    """单位圆上的segments个点，从y轴正方向开始逆时针排列，与primitive_cylinder_add的顶点顺序相同"""
+    angles = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    return np.column_stack([-np.sin(angles), np.cos(angles)])
+
+# 预先计算的单位圆，所有圆柱共用，只需乘以半径
+_UNIT_RINGS = {segments: _make_unit_ring(segments) for segments in (16, 32)}
+
+def _unit_ring(segments):
+    """返回segments个点的单位圆，不在预先计算的表中时计算一次并保存"""
+    ring = _UNIT_RINGS.get(segments)
+    if ring is None:
+        ring = _UNIT_RINGS[segments] = _make_unit_ring(segments)
+    return ring
+
+def _cylinder_verts_numpy(ring, radius, depth):
+    """圆柱的顶点，ring为单位圆，依次为底面一圈、顶面一圈、底面中心和顶面中心"""
+    vertices = len(ring)
+    verts = np.zeros((2 * vertices + 2, 3), dtype=np.float32)
+    verts[:vertices, :2] = ring * radius
+    verts[vertices:2 * vertices, :2] = verts[:vertices, :2]
+    verts[:vertices, 2] = -depth / 2
+    verts[vertices:2 * vertices, 2] = depth / 2
+    verts[2 * vertices, 2] = -depth / 2
+    verts[2 * vertices + 1, 2] = depth / 2
+    return verts
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _cylinder_verts(ring, radius, depth):
+        """与_cylinder_verts_numpy相同，用一个循环直接填充顶点缓冲区"""
+        vertices = ring.shape[0]
+        verts = np.zeros((2 * vertices + 2, 3), dtype=np.float32)
+        for i in range(vertices):
+            x = ring[i, 0] * radius
+            y = ring[i, 1] * radius
+            verts[i, 0] = x
+            verts[i, 1] = y
+            verts[i, 2] = -depth / 2
+            verts[i + vertices, 0] = x
+            verts[i + vertices, 1] = y
+            verts[i + vertices, 2] = depth / 2
+        verts[2 * vertices, 2] = -depth / 2
+        verts[2 * vertices + 1, 2] = depth / 2
+        return verts
+else:
+    _cylinder_verts = _cylinder_verts_numpy
+
+def _make_cylinder(vertices, radius, depth):
+    """
+    计算圆柱的顶点和面，中心在原点，轴沿z方向
+    侧面为四边形，两端为以端面中心为顶点的三角扇，不需要再对n边形做三角化
+    返回(verts, loops, loop_starts)：loops为所有面依次排列的顶点索引，loop_starts为每个面在loops中的起点
+    """
+    verts = _cylinder_verts(_unit_ring(vertices), float(radius), float(depth))
+    
+    index = np.arange(vertices, dtype=np.int32)
+    following = (index + 1) % vertices
+    sides = np.column_stack([index, following, following + vertices, index + vertices])
+    # 底面三角形顺时针排列使法线朝下，顶面逆时针排列使法线朝上
+    bottom = np.column_stack([np.full(vertices, 2 * vertices, dtype=np.int32), following, index])
+    top = np.column_stack([np.full(vertices, 2 * vertices + 1, dtype=np.int32), index + vertices, following + vertices])
+    loops = np.concatenate([sides.ravel(), bottom.ravel(), top.ravel()])
+    loop_starts = np.append(np.arange(0, sides.size, 4, dtype=np.int32), sides.size + np.arange(0, 6 * vertices, 3, dtype=np.int32))
+    return verts, loops, loop_starts
+
+# 绕X轴旋转90度的矩阵，用于直接旋转顶点
+_ROTATE_X_90 = np.array([(1, 0, 0), (0, 0, -1), (0, 1, 0)], dtype=np.float32)
+
+def _make_drum(segments, ring_count, diameter, thickness):
+    """
+    计算鼓型主体的顶点和面，轴沿z方向，中心在原点，返回值与_make_cylinder相同
+    形状与把UV球压扁到thickness、再把顶部和底部0.2以内的顶点拉平的结果相同，
+    拉平后落在同一平面内的几圈顶点只保留最外面一圈，顶面和底面为以中心为顶点的三角扇
+    """
+    polar = np.pi * np.arange(1, ring_count) / ring_count
+    ring_radius = diameter / 2 * np.sin(polar)
+    ring_z = thickness / 2 * np.cos(polar)
+    
+    # 顶部被拉平的圈数，拉平后的高度为这些顶点和极点的平均高度，底部对称
+    flat = int(np.count_nonzero(ring_z > thickness / 2 - 0.2))
+    flat_z = (thickness / 2 + segments * ring_z[:flat].sum()) / (1 + segments * flat)
+    flat = max(flat, 1)
+    ring_radius = ring_radius[flat - 1:ring_count - flat]
+    ring_z = np.concatenate([[flat_z], ring_z[flat:ring_count - 1 - flat], [-flat_z]])
+    rings = len(ring_z)
+    
+    ring = _unit_ring(segments)
+    verts = np.stack(np.broadcast_arrays(
+        ring_radius[:, None] * ring[:, 0], ring_radius[:, None] * ring[:, 1], ring_z[:, None]
+    ), axis=-1).reshape(-1, 3)
+    # 最后两个顶点为顶面和底面的中心
+    verts = np.concatenate([verts, [(0, 0, flat_z), (0, 0, -flat_z)]]).astype(np.float32)
+    top_center = rings * segments
+    
+    index = np.arange(segments, dtype=np.int32)
+    following = (index + 1) % segments
+    upper = np.arange(rings - 1, dtype=np.int32)[:, None] * segments
+    lower = upper + segments
+    quads = np.stack(np.broadcast_arrays(upper + index, lower + index, lower + following, upper + following), axis=-1)
+    # 顶面三角形逆时针排列使法线朝上，底面顺时针排列使法线朝下
+    last = (rings - 1) * segments
+    top = np.column_stack([np.full(segments, top_center, dtype=np.int32), index, following])
+    bottom = np.column_stack([np.full(segments, top_center + 1, dtype=np.int32), last + following, last + index])
+    loops = np.concatenate([quads.ravel(), top.ravel(), bottom.ravel()])
+    loop_starts = np.append(np.arange(0, quads.size, 4, dtype=np.int32), quads.size + np.arange(0, 6 * segments, 3, dtype=np.int32))
+    return verts, loops, loop_starts
+
+def _create_mesh(name, verts, loops, loop_starts):
+    """用foreach_set一次写入网格数据"""
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(verts))
+    mesh.loops.add(len(loops))
+    mesh.polygons.add(len(loop_starts))
+    mesh.vertices.foreach_set("co", verts.ravel())
+    mesh.loops.foreach_set("vertex_index", loops)
+    # Blender 4.x中loop_total由loop_start推出
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    mesh.update(calc_edges=True)
+    return mesh
+
+def _create_mesh_object(name, verts, loops, loop_starts, location=(0, 0, 0)):
+    """创建网格物体并链接到当前集合，不经过bpy.ops，避免每次调用都刷新场景"""
+    obj = bpy.data.objects.new(name, _create_mesh(name, verts, loops, loop_starts))
+    obj.location = location
+    bpy.context.collection.objects.link(obj)
+    return obj
+
+def _merge_parts(parts):
+    """
+    把多个部件的顶点和面合并成一组数组，parts为(verts, loops, loop_starts, material_index)的列表
+    返回合并后的verts、loops、loop_starts和每个面的材质槽索引
+    """
+    all_verts, all_loops, all_loop_starts, all_material_indices = [], [], [], []
+    vert_offset = 0
+    loop_offset = 0
+    for verts, loops, loop_starts, material_index in parts:
+        all_verts.append(verts)
+        all_loops.append(loops + vert_offset)
+        all_loop_starts.append(loop_starts + loop_offset)
+        all_material_indices.append(np.full(len(loop_starts), material_index, dtype=np.int32))
+        vert_offset += len(verts)
+        loop_offset += len(loops)
+    return (np.concatenate(all_verts), np.concatenate(all_loops),
+            np.concatenate(all_loop_starts), np.concatenate(all_material_indices))
 
 def create_drum_shaped_body(diameter, thickness):
-    """创建真正的鼓型电容主体 - 修正下半部分处理"""
-    # 创建一个球体
-    bpy.ops.mesh.primitive_uv_sphere_add(
-        segments=32,
-        ring_count=16,
-        radius=diameter/2,
-        location=(0, 0, thickness/2)
-    )
-    body = bpy.context.active_object
-    
-    # 进入编辑模式
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
-    
-    # 压扁球体形成鼓型
-    bpy.ops.transform.resize(value=(1, 1, thickness/diameter))
-    
-    # 选择顶部和底部的顶点并分别拉平
-    bpy.ops.mesh.select_all(action='DESELECT')
-    
-    bm = bmesh.from_edit_mesh(body.data)
-    
-    # 选择顶部的顶点（Z坐标大于0）
-    for vert in bm.verts:
-        if vert.co.z > thickness/2 - 0.2:  # 选择顶部附近的顶点
-            vert.select = True
-    
-    # 将选中的顶部顶点在Z轴上缩放为0，使其平坦
-    bpy.ops.transform.resize(value=(1, 1, 0))
-    
-    # 取消选择所有顶点
-    bpy.ops.mesh.select_all(action='DESELECT')
-    
-    # 选择底部的顶点（Z坐标小于0）
-    for vert in bm.verts:
-        if vert.co.z < -thickness/2 + 0.2:  # 选择底部附近的顶点
-            vert.select = True
-    
-    # 将选中的底部顶点在Z轴上缩放为0，使其平坦
-    bpy.ops.transform.resize(value=(1, 1, 0))
+    """
+    创建真正的鼓型电容主体 - 修正下半部分处理
+    返回以主体中心为原点的(verts, loops, loop_starts, material_index)，材质槽为0
+    """
+    verts, loops, loop_starts = _make_drum(32, 16, diameter, thickness)
     
-    # 退出编辑模式
-    bpy.ops.object.mode_set(mode='OBJECT')
+    # 将电容主体绕X轴旋转90度，使其平放，直接旋转顶点，物体本身不带旋转
+    verts = verts @ _ROTATE_X_90.T
     
-    return body
+    return verts, loops, loop_starts, 0
 
 def create_radial_capacitor(rad_type="100mil", body_color=(0.2, 0.4, 0.8, 1.0), 
                           pin_color=(0.8, 0.8, 0.8, 1.0)):
@@ -74,20 +204,12 @@ def create_radial_capacitor(rad_type="100mil", body_color=(0.2, 0.4, 0.8, 1.0),
     创建直插瓷片电容 - 真正的鼓型版本
     """
     
-    # 封装尺寸定义 (单位: mm)
-    dimensions = {
-        "100mil": {"pin_spacing": 2.54, "diameter": 6.0, "thickness": 1.5},
-        "200mil": {"pin_spacing": 5.08, "diameter": 8.0, "thickness": 2.0},
-        "300mil": {"pin_spacing": 7.62, "diameter": 10.0, "thickness": 2.5},
-        "400mil": {"pin_spacing": 10.16, "diameter": 12.0, "thickness": 3.0},
-    }
-    
     # 获取尺寸参数
-    if rad_type not in dimensions:
+    if rad_type not in MULTILAYER_SIZES:
         print(f"不支持的封装类型: {rad_type}, 使用默认100mil")
         rad_type = "100mil"
     
-    dim = dimensions[rad_type]
+    dim = MULTILAYER_SIZES[rad_type]
     pin_spacing = dim["pin_spacing"]
     diameter = dim["diameter"]
     thickness = dim["thickness"]
@@ -96,41 +218,34 @@ def create_radial_capacitor(rad_type="100mil", body_color=(0.2, 0.4, 0.8, 1.0),
     pin_diameter = 0.5
     pin_length = 10.0
     
-    # 创建鼓型电容主体
-    body = create_drum_shaped_body(diameter, thickness)
-    body.name = f"Capacitor_{rad_type}_Body"
-    
-    # 将电容主体绕X轴旋转90度，使其平放
-    body.rotation_euler = (math.radians(90), 0, 0)
-    
-    # 设置主体材质
-    mat_body = create_material("Body_Material", body_color)
-    body.data.materials.append(mat_body)
-    
-    # 创建引脚
-    create_pins(pin_spacing, pin_diameter, pin_length, pin_color)
+    # 鼓型电容主体和引脚的顶点直接合并成一个网格，不再创建单独的物体再合并
+    # 物体原点在主体中心，引脚的顶点换算到物体的局部坐标
+    body_center = np.array((0, 0, thickness/2), dtype=np.float32)
+    pin_verts, pin_loops, pin_loop_starts, pin_material_index = create_pins(pin_spacing, pin_diameter, pin_length)
+    verts, loops, loop_starts, material_indices = _merge_parts([
+        create_drum_shaped_body(diameter, thickness),
+        (pin_verts - body_center, pin_loops, pin_loop_starts, pin_material_index),
+    ])
+    body = _create_mesh_object(f"Radial_Capacitor_{rad_type}", verts, loops, loop_starts, location=body_center)
+    body.data.polygons.foreach_set("material_index", material_indices)
     
-    # 选择所有部件
-    bpy.ops.object.select_all(action='DESELECT')
-    body.select_set(True)
-    for obj in bpy.context.scene.objects:
-        if "Pin" in obj.name:
-            obj.select_set(True)
+    # 设置主体和引脚材质
+    body.data.materials.append(create_material("Body_Material", body_color))
+    body.data.materials.append(create_material("Pin_Material", pin_color))
     
-    # 合并为单个物体
-    bpy.context.view_layer.objects.active = body
-    bpy.ops.object.join()
-    
-    # 重命名最终物体
-    body.name = f"Radial_Capacitor_{rad_type}"
+    # 所有物体都通过bpy.data创建，最后只更新一次视图层
+    bpy.context.view_layer.update()
     
     print(f"成功创建 {rad_type} 封装鼓型瓷片电容")
     print(f"引脚间距: {pin_spacing}mm, 直径: {diameter}mm, 厚度: {thickness}mm")
     
     return body
 
-def create_pins(pin_spacing, pin_diameter, pin_length, pin_color):
-    """创建引脚"""
+def create_pins(pin_spacing, pin_diameter, pin_length):
+    """
+    创建引脚
+    返回两个引脚合并后的(verts, loops, loop_starts, material_index)，材质槽为1
+    """
     
     # 引脚从电容底部中心垂直向下
     pin_positions = [
@@ -138,43 +253,71 @@ def create_pins(pin_spacing, pin_diameter, pin_length, pin_color):
         (pin_spacing/2, 0, -pin_length/2)
     ]
     
-    for i, pos in enumerate(pin_positions):
-        # 创建引脚圆柱体
-        bpy.ops.mesh.primitive_cylinder_add(
-            vertices=16,
-            radius=pin_diameter/2,
-            depth=pin_length,
-            location=(pos[0], pos[1], pos[2])
-        )
-        pin = bpy.context.active_object
-        pin.name = f"Capacitor_Pin_{i+1}"
-        
-        # 设置引脚材质
-        mat_pin = create_material("Pin_Material", pin_color)
-        pin.data.materials.append(mat_pin)
-
-def create_material(name, color):
-    """创建材质"""
-    mat = bpy.data.materials.new(name=name)
+    # 两个引脚的拓扑相同，只生成一次圆柱再平移
+    verts, loops, loop_starts = _make_cylinder(16, pin_diameter/2, pin_length)
+    pin_verts, pin_loops, pin_loop_starts, _ = _merge_parts([
+        (verts + np.array(pos, dtype=np.float32), loops, loop_starts, 1) for pos in pin_positions
+    ])
+    return pin_verts, pin_loops, pin_loop_starts, 1
+
+# 只有PBR材质节点和输出节点的模板材质，名称以点开头不在界面中显示
+_TEMPLATE_MAT = None
+
+def _get_template_material():
+    """返回模板材质，第一次调用时创建"""
+    global _TEMPLATE_MAT
+    try:
+        if _TEMPLATE_MAT is not None and bpy.data.materials.get(_TEMPLATE_MAT.name) == _TEMPLATE_MAT:
+            return _TEMPLATE_MAT
+    except ReferenceError:
+        pass
+    
+    # 脚本重新运行后全局变量被重置，但之前的模板还在bpy.data中，直接复用
+    existing = bpy.data.materials.get(".Capacitor_Template")
+    if existing is not None and existing.node_tree and 'Principled BSDF' in existing.node_tree.nodes:
+        _TEMPLATE_MAT = existing
+        return existing
+    
+    mat = bpy.data.materials.new(name=".Capacitor_Template")
     mat.use_nodes = True
     
-    # 清除默认节点
     nodes = mat.node_tree.nodes
     nodes.clear()
     
-    # 添加PBR材质节点
-    bsdf = nodes.new('ShaderNodeBsdfPrincipled')
-    output = nodes.new('ShaderNodeOutputMaterial')
-    
-    bsdf.inputs['Base Color'].default_value = color
-    bsdf.inputs['Roughness'].default_value = 0.4
-    bsdf.inputs['Metallic'].default_value = 0.0
-    
+    bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
+    bsdf.name = 'Principled BSDF'
+    output = nodes.new(type='ShaderNodeOutputMaterial')
     mat.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
     
-    # 设置实体视图下的颜色
+    _TEMPLATE_MAT = mat
+    return mat
+
+# 已创建材质的缓存，键为(name, color, metallic, roughness)
+_MATERIAL_CACHE = {}
+
+def create_material(name, color, metallic=0.0, roughness=0.4):
+    """创建材质，同样参数的材质只创建一次，之后的电容直接复用"""
+    key = (name, tuple(color), metallic, roughness)
+    mat = _MATERIAL_CACHE.get(key)
+    if mat is not None:
+        try:
+            # 材质可能已被删除或改名
+            if bpy.data.materials.get(mat.name) == mat:
+                return mat
+        except ReferenceError:
+            pass
+    
+    # 复制模板材质，节点树随材质一起复制，只需修改输入值
+    mat = _get_template_material().copy()
+    mat.name = name
     mat.diffuse_color = color
     
+    bsdf = mat.node_tree.nodes['Principled BSDF']
+    bsdf.inputs['Base Color'].default_value = color
+    bsdf.inputs['Metallic'].default_value = metallic
+    bsdf.inputs['Roughness'].default_value = roughness
+    
+    _MATERIAL_CACHE[key] = mat
     return mat
 
 # 主执行函数
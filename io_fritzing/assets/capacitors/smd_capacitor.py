@@ -1,9 +1,9 @@
 import bpy
-import bmesh
-from mathutils import Vector
+import numpy as np
 from ..utils.scene import clear_scene, create_lighting, create_camera
 from ..utils.origin import set_origin_to_bottom
 from ..utils.material import create_material
+from ..utils.mesh import create_boxes_mesh
 
 # 定义常见贴片电容封装尺寸（单位：毫米）- 保留所有尺寸
 CAPACITOR_SIZES = {
@@ -15,90 +15,139 @@ CAPACITOR_SIZES = {
     '1812': {'length': 4.5, 'width': 3.2, 'height': 1.6}
 }
 
+# 各尺寸的派生参数在导入时一次算好，按_SIZE_NAMES的顺序排列
+_SIZE_NAMES = list(CAPACITOR_SIZES)
+_DIMS = np.array([(d['length'], d['width'], d['height']) for d in CAPACITOR_SIZES.values()], dtype=np.float32)
+# 焊端参数（宽、高等于电容尺寸，长为电容长度的20%）
+_TERMINALS = _DIMS * np.array([0.2, 1.0, 1.0], dtype=np.float32)
+# 陶瓷本体参数（长度去掉两端焊端，宽、高为电容尺寸的95%）
+_BODIES = _DIMS * np.array([1.0, 0.95, 0.95], dtype=np.float32)
+_BODIES[:, 0] -= 2 * _TERMINALS[:, 0]
 
-def create_smd_capacitor_model(size_name='0603'):
-    """创建单个陶瓷贴片电容"""
+# 各尺寸共用的电容网格，键为(尺寸, 本体材质名, 焊端材质名)
+_CAPACITOR_MESH_CACHE = {}
+
+
+def _capacitor_boxes(size_name, y_offset=0):
+    """返回电容本体和两个焊端的(size, center, material_index)列表，材质槽0为本体，1为焊端"""
+    index = _SIZE_NAMES.index(size_name)
+    body_size = tuple(_BODIES[index].tolist())
+    terminal_size = tuple(_TERMINALS[index].tolist())
+    terminal_x = (body_size[0] + terminal_size[0]) / 2
+    return [
+        (body_size, (0, y_offset, 0), 0),
+        (terminal_size, (-terminal_x, y_offset, 0), 1),
+        (terminal_size, (terminal_x, y_offset, 0), 1),
+    ]
+
+
+def _create_capacitor_object(name, boxes, ceramic_mat, terminal_mat):
+    """把长方体写入同一个网格并创建物体，原点设在底部中心"""
+    mesh = create_boxes_mesh(name, boxes)
+    mesh.materials.append(ceramic_mat)
+    mesh.materials.append(terminal_mat)
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(obj)
+
+    set_origin_to_bottom(obj)
+
+    return obj
+
+
+def _get_capacitor_mesh(size_name, ceramic_mat, terminal_mat):
+    """
+    返回同一尺寸、同一组材质的电容共用的网格
+    网格的原点已经在底部中心，多个电容物体共用同一个网格数据块
+    """
+    key = (size_name, ceramic_mat.name, terminal_mat.name)
+    mesh = _CAPACITOR_MESH_CACHE.get(key)
+    if mesh is not None:
+        try:
+            # 网格可能已被删除或改名
+            if bpy.data.meshes.get(mesh.name) == mesh:
+                return mesh
+        except ReferenceError:
+            pass
+
+    half_height = float(_DIMS[_SIZE_NAMES.index(size_name), 2]) / 2
+    boxes = [(size, (x, y, z + half_height), material_index) for size, (x, y, z), material_index in _capacitor_boxes(size_name)]
+    mesh = create_boxes_mesh(f"SMD_Capacitor_{size_name}", boxes)
+    mesh.materials.append(ceramic_mat)
+    mesh.materials.append(terminal_mat)
+    _CAPACITOR_MESH_CACHE[key] = mesh
+    return mesh
+
+
+def _create_capacitor_instance(size_name, ceramic_mat, terminal_mat, y_offset=0):
+    """用共用网格创建电容物体，位置与把原点设到底部中心之前的几何体位置一致"""
+    obj = bpy.data.objects.new(f"SMD_Capacitor_{size_name}", _get_capacitor_mesh(size_name, ceramic_mat, terminal_mat))
+    obj.location = (0, y_offset, -float(_DIMS[_SIZE_NAMES.index(size_name), 2]) / 2)
+    bpy.context.collection.objects.link(obj)
+    return obj
+
+
+def create_smd_capacitor_model(size_name='0603', ceramic_mat=None, terminal_mat=None):
+    """创建单个陶瓷贴片电容，批量创建时可以传入共用的材质"""
     if size_name not in CAPACITOR_SIZES:
         size_name = '0603'
     
-    dimensions = CAPACITOR_SIZES[size_name]
-    length = dimensions['length']
-    width = dimensions['width']
-    height = dimensions['height']
-    
-    # 焊端参数（尺寸等于电容尺寸）
-    terminal_length = length * 0.2
-    terminal_width = width
-    terminal_height = height
-    
-    # 陶瓷本体参数（尺寸为电容尺寸的95%）
-    body_length = length - 2 * terminal_length
-    body_width = width * 0.95
-    body_height = height * 0.95
-    
     # 创建材质
-    ceramic_mat = create_material(name="Ceramic_Body_Dark", base_color=(0.47, 0.36, 0.28), metallic=0.0, roughness=0.2)
-    terminal_mat = create_material(name="Terminal_Metal", base_color=(0.9, 0.9, 0.92), metallic=0.95, roughness=0.15)
-    
-    # 1. 创建陶瓷本体
-    bm_body = bmesh.new()
-    body_size = Vector((body_length, body_width, body_height))
-    bmesh.ops.create_cube(bm_body, size=1.0)
-    for v in bm_body.verts:
-        v.co = v.co * body_size
-    
-    mesh_body = bpy.data.meshes.new("Ceramic_Body")
-    bm_body.to_mesh(mesh_body)
-    obj_body = bpy.data.objects.new("Ceramic_Body", mesh_body)
-    bpy.context.collection.objects.link(obj_body)
-    obj_body.data.materials.clear()
-    obj_body.data.materials.append(ceramic_mat)
+    if ceramic_mat is None:
+        ceramic_mat = create_ceramic_material()
+    if terminal_mat is None:
+        terminal_mat = create_terminal_material()
     
-    # 2. 创建左侧金属焊端
-    bm_left_terminal = bmesh.new()
-    left_terminal_size = Vector((terminal_length, terminal_width, terminal_height))
-    bmesh.ops.create_cube(bm_left_terminal, size=1.0)
-    for v in bm_left_terminal.verts:
-        v.co = v.co * left_terminal_size
-        v.co.x -= (body_length + terminal_length) / 2
+    # 本体和两个焊端在同一个网格中，同一尺寸的电容共用这个网格
+    obj_body = _create_capacitor_instance(size_name, ceramic_mat, terminal_mat)
     
-    mesh_left_terminal = bpy.data.meshes.new("Left_Terminal")
-    bm_left_terminal.to_mesh(mesh_left_terminal)
-    obj_left_terminal = bpy.data.objects.new("Left_Terminal", mesh_left_terminal)
-    bpy.context.collection.objects.link(obj_left_terminal)
-    obj_left_terminal.data.materials.append(terminal_mat)
-    
-    # 3. 创建右侧金属焊端
-    bm_right_terminal = bmesh.new()
-    right_terminal_size = Vector((terminal_length, terminal_width, terminal_height))
-    bmesh.ops.create_cube(bm_right_terminal, size=1.0)
-    for v in bm_right_terminal.verts:
-        v.co = v.co * right_terminal_size
-        v.co.x += (body_length + terminal_length) / 2
-    
-    mesh_right_terminal = bpy.data.meshes.new("Right_Terminal")
-    bm_right_terminal.to_mesh(mesh_right_terminal)
-    obj_right_terminal = bpy.data.objects.new("Right_Terminal", mesh_right_terminal)
-    bpy.context.collection.objects.link(obj_right_terminal)
-    obj_right_terminal.data.materials.append(terminal_mat)
-    
-    # 清理bmesh
-    bm_body.free()
-    bm_left_terminal.free()
-    bm_right_terminal.free()
+    # 以上都是直接写数据，最后统一更新一次视图层
+    bpy.context.view_layer.update()
+
+    return obj_body
+
+
+def create_smd_capacitor_array(size_names=None, ceramic_mat=None, terminal_mat=None, separate=False):
+    """
+    沿y方向排列创建多种尺寸的陶瓷贴片电容
+    默认所有电容写入同一个网格，只创建一个物体；separate为True时每个尺寸单独创建一个物体
+    """
+    if size_names is None:
+        size_names = _SIZE_NAMES
+    if ceramic_mat is None:
+        ceramic_mat = create_ceramic_material()
+    if terminal_mat is None:
+        terminal_mat = create_terminal_material()
+    
+    # 每个电容的y方向位置，间距逐渐增大
+    offsets = []
+    y_offset = 0
+    increment = 1
+    for _ in size_names:
+        offsets.append(y_offset)
+        y_offset += 2 + increment
+        increment += 0.5
     
-    # 合并所有对象
-    bpy.ops.object.select_all(action='DESELECT')
-    obj_body.select_set(True)
-    obj_left_terminal.select_set(True)
-    obj_right_terminal.select_set(True)
-    bpy.context.view_layer.objects.active = obj_body
-    bpy.ops.object.join()
-    obj_body.name = f"SMD_Capacitor_{size_name}"
+    if separate:
+        caps = [
+            _create_capacitor_instance(size_name, ceramic_mat, terminal_mat, offset)
+            for size_name, offset in zip(size_names, offsets)
+        ]
+    else:
+        boxes = []
+        for size_name, offset in zip(size_names, offsets):
+            boxes.extend(_capacitor_boxes(size_name, offset))
+        caps = [_create_capacitor_object("SMD_Capacitors", boxes, ceramic_mat, terminal_mat)]
+    
+    # 以上都是直接写数据，最后统一更新一次视图层
+    bpy.context.view_layer.update()
+    
+    return caps
 
-    set_origin_to_bottom(obj_body)
+def create_ceramic_material():
+    return create_material(name="Ceramic_Body_Dark", base_color=(0.47, 0.36, 0.28), metallic=0.0, roughness=0.2)
 
-    return obj_body
+def create_terminal_material():
+    return create_material(name="Terminal_Metal", base_color=(0.9, 0.9, 0.92), metallic=0.95, roughness=0.15)
 
 def main():
     clear_scene()
@@ -111,18 +160,11 @@ def main():
     print("创建多种陶瓷贴片电容3D模型")
     print(f"将创建 {len(CAPACITOR_SIZES.keys())} 个陶瓷贴片电容模型")
     
-    caps = []
-    y_offset = 0
-    increment = 1
-    
-    for key in CAPACITOR_SIZES.keys():
-        ecap = create_smd_capacitor_model(key)
-        ecap.location.y += y_offset
-        y_offset += 2 + increment
-        increment += 0.5
+    # 所有尺寸共用同一组材质，写入同一个物体
+    caps = create_smd_capacitor_array(list(CAPACITOR_SIZES.keys()))
+    for ecap in caps:
         # 添加到集合
         collection.objects.link(ecap)
-        caps.append(ecap)
 
     print("陶瓷贴片电容3D模型生成完毕！")
 
@@ -1,9 +1,10 @@
 import bpy
-import bmesh
-from mathutils import Matrix
+import bisect
 import math
-from ..utils.scene import clear_scene, create_lighting, create_camera
+from mathutils import Matrix
+from ..utils.scene import clear_scene, create_lighting, create_camera, suspend_undo
 from ..utils.material import create_material
+from ..utils.mesh import create_arc_prism_mesh, create_object, create_prism_mesh, get_cylinder_mesh, get_unit_cube_mesh, merge_meshes
 
 
 # 根据图片中的表格定义W值映射表（根据直径ΦD）
@@ -18,6 +19,10 @@ W_VALUE_MAP = {
     16.0: (1.1, 1.4)        # ΦD=16: W=1.1~1.4
 }
 
+# 排好序的标准直径和对应W值范围的中间值，导入时算好
+_W_KEYS = sorted(W_VALUE_MAP)
+_W_MID = {key: (low + high) / 2 for key, (low, high) in W_VALUE_MAP.items()}
+
 # 定义常见贴片电解电容封装尺寸（单位：毫米），恢复之前的参数
 ELECTROLYTIC_SIZES = {
     '3x5.3mm': {'diameter': 3.0, 'height': 5.3, 'lead_spacing': 0.8, 'horizontal_exposed_type': 1},
@@ -44,11 +49,12 @@ PACKAGE_SIZE_MAP = {
 
 def get_w_value(diameter):
     """根据直径获取对应的W值（取范围中间值）"""
-    # 找到最接近的标准直径
-    closest_diameter = min(W_VALUE_MAP.keys(), key=lambda x: abs(x - diameter))
-    w_range = W_VALUE_MAP[closest_diameter]
+    # 二分查找最接近的标准直径，只需比较两侧相邻的两个
+    index = bisect.bisect_left(_W_KEYS, diameter)
+    candidates = _W_KEYS[max(index - 1, 0):index + 1]
+    closest_diameter = min(candidates, key=lambda x: abs(x - diameter))
     # 返回范围中间值
-    return (w_range[0] + w_range[1]) / 2
+    return _W_MID[closest_diameter]
 
 def get_horizontal_exposed_length(horizontal_exposed_type):
     """根据水平露出长度类型返回对应的露出长度"""
@@ -60,101 +66,24 @@ def get_horizontal_exposed_length(horizontal_exposed_type):
         return 0.4  # 默认值
     
 def create_vent_marking(body_height, diameter):
-    """创建顶部防爆阀标记"""
-    bm_vent = bmesh.new()
+    """创建顶部防爆阀标记，返回把单位立方体放到电容顶部的变换矩阵"""
     vent_size = diameter * 0.15
     vent_depth = 0.01
-    bmesh.ops.create_cube(bm_vent, size=1.0)
-    for v in bm_vent.verts:
-        v.co.x *= vent_size
-        v.co.y *= vent_size
-        v.co.z *= vent_depth
-        v.co.z += body_height / 2 + vent_depth / 2
-    
-    mesh_vent = bpy.data.meshes.new("Vent_Marking")
-    bm_vent.to_mesh(mesh_vent)
-    obj_vent = bpy.data.objects.new("Vent_Marking", mesh_vent)
-    bpy.context.collection.objects.link(obj_vent)
-    return obj_vent
+    return Matrix.LocRotScale((0, 0, body_height / 2 + vent_depth / 2), None, (vent_size, vent_size, vent_depth))
 
 def create_polarity_marking(body_height, body_radius):
     """创建弓形极性标记"""
-    bm_polarity = bmesh.new()
-    
     # 弓形参数
     arc_radius = body_radius
     arc_height = 0.01
     start_angle = math.radians(120)
     end_angle = math.radians(240)
     segments = 16
-    delta_angle = math.radians(1)
-    
-    # 创建外弧顶点
-    vertices_top = []
-    vertices_bottom = []
-    
-    for i in range(segments + 1):
-        angle = start_angle + (end_angle - start_angle) * (i / segments)
-        x = math.cos(angle) * arc_radius
-        y = math.sin(angle) * arc_radius
-        vertices_top.append(bm_polarity.verts.new((x, y, arc_height/2)))
-        vertices_bottom.append(bm_polarity.verts.new((x, y, -arc_height/2)))
-    
-    # 计算弦中点
-    start_point = (math.cos(start_angle) * arc_radius, math.sin(start_angle) * arc_radius)
-    end_point = (math.cos(end_angle) * arc_radius, math.sin(end_angle) * arc_radius)
-    chord_midpoint = ((start_point[0] + end_point[0])/2, (start_point[1] + end_point[1])/2)
-    mid_top = bm_polarity.verts.new((chord_midpoint[0], chord_midpoint[1], arc_height/2))
-    mid_bottom = bm_polarity.verts.new((chord_midpoint[0], chord_midpoint[1], -arc_height/2))
-    
-    # 创建外弧面
-    for i in range(segments):
-        v1 = vertices_top[i]
-        v2 = vertices_top[i+1]
-        v3 = vertices_bottom[i+1]
-        v4 = vertices_bottom[i]
-        bm_polarity.faces.new([v1, v2, v3, v4])
-    
-    # 创建顶面
-    for i in range(segments):
-        v1 = mid_top
-        v2 = vertices_top[i]
-        v3 = vertices_top[i+1]
-        bm_polarity.faces.new([v1, v2, v3])
-    
-    # 创建底面
-    for i in range(segments):
-        v1 = mid_bottom
-        v2 = vertices_bottom[i]
-        v3 = vertices_bottom[i+1]
-        bm_polarity.faces.new([v1, v2, v3])
-    
-    # 创建起始端矩形面
-    angle_start_delta = start_angle + delta_angle
-    x_delta = math.cos(angle_start_delta) * arc_radius
-    y_delta = math.sin(angle_start_delta) * arc_radius
-    v3 = bm_polarity.verts.new((x_delta, y_delta, arc_height/2))
-    v4 = bm_polarity.verts.new((x_delta, y_delta, -arc_height/2))
-    bm_polarity.faces.new([vertices_top[0], vertices_bottom[0], v4, v3])
-    
-    # 创建结束端矩形面
-    angle_end_delta = end_angle - delta_angle
-    x_delta_end = math.cos(angle_end_delta) * arc_radius
-    y_delta_end = math.sin(angle_end_delta) * arc_radius
-    v7 = bm_polarity.verts.new((x_delta_end, y_delta_end, arc_height/2))
-    v8 = bm_polarity.verts.new((x_delta_end, y_delta_end, -arc_height/2))
-    bm_polarity.faces.new([vertices_top[-1], vertices_bottom[-1], v8, v7])
     
     # 定位到电容顶部
-    for v in bm_polarity.verts:
-        v.co.z += body_height / 2 + arc_height / 2
-    
-    mesh_polarity = bpy.data.meshes.new("Polarity_Marking")
-    bm_polarity.to_mesh(mesh_polarity)
-    obj_polarity = bpy.data.objects.new("Polarity_Marking", mesh_polarity)
-    bpy.context.collection.objects.link(obj_polarity)
-
-    return obj_polarity
+    return create_arc_prism_mesh(
+        "Polarity_Marking", arc_radius, start_angle, end_angle, segments, body_height / 2, body_height / 2 + arc_height
+    )
 
 def create_extension_boards(
         body_height, base_size, base_height,lead_spacing, w_value, extension_height, horizontal_exposed_length
@@ -169,21 +98,9 @@ def create_extension_boards(
     # 计算延伸板中心点X坐标
     extension_center_x = extension_right_edge - extension_length / 2
     
-    # 正极延伸板（右侧）
-    bm_positive_extension = bmesh.new()
-    bmesh.ops.create_cube(bm_positive_extension, size=1.0)
-    for v in bm_positive_extension.verts:
-        v.co.x *= extension_length
-        v.co.y *= w_value  # 使用W值作为延伸板宽度
-        v.co.z *= extension_height
-        # 定位到右侧，超出底座指定长度（恢复之前的计算方式）
-        v.co.x += extension_center_x
-        v.co.z -= (body_height / 2 - extension_height / 2.1 + base_height)
-    
-    mesh_positive_extension = bpy.data.meshes.new("Positive_Extension")
-    bm_positive_extension.to_mesh(mesh_positive_extension)
-    positive_extension = bpy.data.objects.new("Positive_Extension", mesh_positive_extension)
-    bpy.context.collection.objects.link(positive_extension)
+    # 使用W值作为延伸板宽度
+    extension_size = (extension_length, w_value, extension_height)
+    extension_z = -(body_height / 2 - extension_height / 2.1 + base_height)
     
     # 负极延伸板（左侧）
     # 计算底座左侧边缘位置
@@ -193,133 +110,46 @@ def create_extension_boards(
     # 计算延伸板中心点X坐标
     extension_center_x_left = extension_left_edge + extension_length / 2
     
-    bm_negative_extension = bmesh.new()
-    bmesh.ops.create_cube(bm_negative_extension, size=1.0)
-    for v in bm_negative_extension.verts:
-        v.co.x *= extension_length
-        v.co.y *= w_value  # 使用W值作为延伸板宽度
-        v.co.z *= extension_height
-        # 定位到左侧，超出底座指定长度（恢复之前的计算方式）
-        v.co.x += extension_center_x_left
-        v.co.z -= (body_height / 2 - extension_height / 2.1 + base_height)
-    
-    mesh_negative_extension = bpy.data.meshes.new("Negative_Extension")
-    bm_negative_extension.to_mesh(mesh_negative_extension)
-    negative_extension = bpy.data.objects.new("Negative_Extension", mesh_negative_extension)
-    bpy.context.collection.objects.link(negative_extension)
-
-    return positive_extension, negative_extension
+    # 正极延伸板在右侧，负极延伸板在左侧，都超出底座指定长度（恢复之前的计算方式）
+    # 两块延伸板都是缩放后的单位立方体，返回各自的变换矩阵
+    return [
+        Matrix.LocRotScale((extension_center_x, 0, extension_z), None, extension_size),
+        Matrix.LocRotScale((extension_center_x_left, 0, extension_z), None, extension_size),
+    ]
 
 def create_bottom_base(body_height, base_size, base_height, height):
-    bm_base = bmesh.new()
-    
-    # 创建正方形底座
-    bmesh.ops.create_cube(bm_base, size=1.0)
-    for v in bm_base.verts:
-        v.co.x *= base_size
-        v.co.y *= base_size
-        v.co.z *= base_height
-        v.co.z -= body_height / 2 + base_height / 2
-    
-    # 创建临时底座对象用于布尔运算
-    mesh_base_temp = bpy.data.meshes.new("Base_Temp")
-    bm_base.to_mesh(mesh_base_temp)
-    obj_base_temp = bpy.data.objects.new("Base_Temp", mesh_base_temp)
-    bpy.context.scene.collection.objects.link(obj_base_temp)
-    
-    # 创建两个旋转45度的正方体用于切角
+    """
+    创建带切角的正方形底座
+    右上角和右下角各被一个旋转45度、边长为cut_size的正方体切去，切口是直线，直接写出六边形棱柱
+    """
+    # 旋转45度的正方体中心在底座角上，切去的直角边长为其半对角线
     cut_size = base_size * 0.3
-    
-    # 创建右上角切角立方体
-    bm_cut_ur = bmesh.new()
-    bmesh.ops.create_cube(bm_cut_ur, size=1.0)
-    for v in bm_cut_ur.verts:
-        v.co.x *= cut_size
-        v.co.y *= cut_size
-        v.co.z *= base_height * 2
-        rotation_matrix = Matrix.Rotation(math.radians(45), 4, 'Z')
-        v.co = rotation_matrix @ v.co
-        v.co.x += base_size / 2
-        v.co.y += base_size / 2
-        v.co.z -= height / 2
-    
-    mesh_cut_ur = bpy.data.meshes.new("Cut_UR")
-    bm_cut_ur.to_mesh(mesh_cut_ur)
-    obj_cut_ur = bpy.data.objects.new("Cut_UR", mesh_cut_ur)
-    bpy.context.scene.collection.objects.link(obj_cut_ur)
-    
-    # 创建右下角切角立方体
-    bm_cut_lr = bmesh.new()
-    bmesh.ops.create_cube(bm_cut_lr, size=1.0)
-    for v in bm_cut_lr.verts:
-        v.co.x *= cut_size
-        v.co.y *= cut_size
-        v.co.z *= base_height * 2
-        rotation_matrix = Matrix.Rotation(math.radians(45), 4, 'Z')
-        v.co = rotation_matrix @ v.co
-        v.co.x += base_size / 2
-        v.co.y -= base_size / 2
-        v.co.z -= height / 2
-    
-    mesh_cut_lr = bpy.data.meshes.new("Cut_LR")
-    bm_cut_lr.to_mesh(mesh_cut_lr)
-    obj_cut_lr = bpy.data.objects.new("Cut_LR", mesh_cut_lr)
-    bpy.context.scene.collection.objects.link(obj_cut_lr)
-    
-    # 使用布尔修改器切除两个角
-    bool_mod_ur = obj_base_temp.modifiers.new(name="Boolean_UR", type='BOOLEAN')
-    bool_mod_ur.operation = 'DIFFERENCE'
-    bool_mod_ur.object = obj_cut_ur
-    
-    bool_mod_lr = obj_base_temp.modifiers.new(name="Boolean_LR", type='BOOLEAN')
-    bool_mod_lr.operation = 'DIFFERENCE'
-    bool_mod_lr.object = obj_cut_lr
-    
-    # 应用修改器
-    bpy.context.view_layer.objects.active = obj_base_temp
-    bpy.ops.object.modifier_apply(modifier=bool_mod_ur.name)
-    bpy.ops.object.modifier_apply(modifier=bool_mod_lr.name)
-    
-    # 将结果转换回bmesh
-    bm_base_final = bmesh.new()
-    bm_base_final.from_mesh(obj_base_temp.data)
-    
-    # 清理临时对象
-    bpy.data.objects.remove(obj_cut_ur)
-    bpy.data.objects.remove(obj_cut_lr)
-    bpy.data.objects.remove(obj_base_temp)
-    
-    mesh_base = bpy.data.meshes.new("Base_Plastic")
-    bm_base_final.to_mesh(mesh_base)
-    obj_base = bpy.data.objects.new("Base_Plastic", mesh_base)
-    bpy.context.collection.objects.link(obj_base)
-
-    return obj_base
+    cut = cut_size / math.sqrt(2)
+    half = base_size / 2
+    
+    # 逆时针排列的底座轮廓
+    outline = [
+        (-half, -half),
+        (half - cut, -half),
+        (half, -half + cut),
+        (half, half - cut),
+        (half - cut, half),
+        (-half, half),
+    ]
+    return create_prism_mesh("Base_Plastic", outline, -(body_height / 2 + base_height), -body_height / 2)
 
 def create_ecap_body(body_height, body_radius):
-    bm_body = bmesh.new()
-    bmesh.ops.create_cone(
-        bm_body,
-        radius1=body_radius,
-        radius2=body_radius,
-        depth=body_height,
-        segments=32,
-        cap_ends=True
-    )
-    
-    mesh_body = bpy.data.meshes.new("Capacitor_Body")
-    bm_body.to_mesh(mesh_body)
-    obj_body = bpy.data.objects.new("Capacitor_Body", mesh_body)
-    bpy.context.collection.objects.link(obj_body)
-
-    return obj_body
+    """返回半径、高度都为1的共用圆柱模板和把它缩放到主体尺寸的变换矩阵"""
+    # 合并时只读取顶点，所有尺寸的电容共用同一个模板网格
+    return get_cylinder_mesh(32, 1.0, 1.0), Matrix.LocRotScale(None, None, (body_radius, body_radius, body_height))
 
 def create_smd_electrolytic_capacitor_with_horizontal_exposed(size_name='6.3x5.3mm'):
     """创建水平露出长度修正的贴片电解电容3D模型"""
-    if size_name not in ELECTROLYTIC_SIZES:
+    dimensions = ELECTROLYTIC_SIZES.get(size_name)
+    if dimensions is None:
+        # 未知尺寸使用默认尺寸，物体名称也随之使用默认尺寸
         size_name = '6.3x5.3mm'
-    
-    dimensions = ELECTROLYTIC_SIZES[size_name]
+        dimensions = ELECTROLYTIC_SIZES[size_name]
     diameter = dimensions['diameter']
     height = dimensions['height']
     lead_spacing = dimensions['lead_spacing']
@@ -341,43 +171,41 @@ def create_smd_electrolytic_capacitor_with_horizontal_exposed(size_name='6.3x5.3
     # 1. 创建电解电容主体（圆柱体，银色）
     body_height = height * 0.95
     body_radius = diameter / 2
-    body = create_ecap_body(body_height, body_radius)
-    body.data.materials.append(body_mat)
+    mesh_body, body_matrix = create_ecap_body(body_height, body_radius)
     
     # 2. 创建底部塑料底座（带切角）
     base_height = height * 0.05
     base_size = diameter + 0.2
-    base = create_bottom_base(body_height, base_size, base_height, height)
-    base.data.materials.append(base_mat)
+    mesh_base = create_bottom_base(body_height, base_size, base_height, height)
     
     # 3. 创建焊端延伸板
-    positive_extension, negative_extension = create_extension_boards(
+    extension_matrices = create_extension_boards(
         body_height, base_size, base_height, lead_spacing, w_value, 0.1, horizontal_exposed_length
     )
-    positive_extension.data.materials.append(lead_mat)
-    negative_extension.data.materials.append(lead_mat)
     
     # 4. 创建弓形极性标记
-    polarity = create_polarity_marking(body_height, body_radius)
-    polarity.data.materials.append(polarity_mat)
+    mesh_polarity = create_polarity_marking(body_height, body_radius)
     
     # 5. 创建顶部防爆阀标记
-    vent = create_vent_marking(body_height, diameter)
-    vent.data.materials.append(vent_mat)
-    
-    # 6. 合并所有对象
-    bpy.ops.object.select_all(action='DESELECT')
-    body.select_set(True)
-    base.select_set(True)
-    polarity.select_set(True)
-    vent.select_set(True)
-    positive_extension.select_set(True)
-    negative_extension.select_set(True)
-    bpy.context.view_layer.objects.active = body
-    bpy.ops.object.join()
-    body.name = f"Electrolytic_Capacitor_{size_name}"
+    vent_matrix = create_vent_marking(body_height, diameter)
+    
+    # 6. 把各部件的网格直接拼接成一个网格，材质槽与下面追加材质的顺序一致
+    name = f"Electrolytic_Capacitor_{size_name}"
+    # 延伸板和防爆阀都从共用的单位立方体按矩阵变换读取
+    unit_cube = get_unit_cube_mesh()
+    mesh = merge_meshes(name, [
+        (mesh_body, body_matrix, 0),
+        (mesh_base, None, 1),
+        *[(unit_cube, matrix, 2) for matrix in extension_matrices],
+        (mesh_polarity, None, 3),
+        (unit_cube, vent_matrix, 4),
+    ])
+    # 临时部件网格已经拼接完毕，主体和立方体用的是共用的模板网格，需要保留
+    bpy.data.batch_remove([mesh_base, mesh_polarity])
+    for material in (body_mat, base_mat, lead_mat, polarity_mat, vent_mat):
+        mesh.materials.append(material)
 
-    body.location.z += body_height / 2 + base_height
+    body = create_object(name, mesh, (0, 0, body_height / 2 + base_height))
     body.rotation_euler.z = math.pi
 
     return body
@@ -389,41 +217,43 @@ def create_smd_ecap_model(package='0605'):
 
 def main():
     """主函数 - 创建多种贴片电解电容"""
-    clear_scene()
+    # 批量创建期间关闭撤销，清理场景、灯光和相机的bpy.ops不再各自压入撤销步骤
+    with suspend_undo():
+        clear_scene()
 
-    # 创建主集合
-    collection = bpy.data.collections.new("Electrolytic_Capacitors_Collection")
-    bpy.context.scene.collection.children.link(collection)
+        # 创建主集合，所有物体放进去之后再链接到场景
+        collection = bpy.data.collections.new("Electrolytic_Capacitors_Collection")
     
-    print("创建多种贴片电解电容3D模型")
-    print("=" * 60)
-    print(f"将创建 {len(ELECTROLYTIC_SIZES.keys())} 个贴片电解电容模型")
+        print("创建多种贴片电解电容3D模型")
+        print("=" * 60)
+        print(f"将创建 {len(ELECTROLYTIC_SIZES.keys())} 个贴片电解电容模型")
     
-    ecaps = []
-    y_offset = 0
-    increment = 1
+        ecaps = []
+        y_offset = 0
+        increment = 1
 
-    for key, value in ELECTROLYTIC_SIZES.items():
-        ecap = create_smd_electrolytic_capacitor_with_horizontal_exposed(key)
-        ecap.location.y += y_offset
-        y_offset += 10 + increment
-        increment += value['horizontal_exposed_type']
-        # 添加到集合
-        collection.objects.link(ecap)
-        ecaps.append(ecap)
+        for key, value in ELECTROLYTIC_SIZES.items():
+            ecap = create_smd_electrolytic_capacitor_with_horizontal_exposed(key)
+            ecap.location.y += y_offset
+            y_offset += 10 + increment
+            increment += value['horizontal_exposed_type']
+            # 添加到集合
+            collection.objects.link(ecap)
+            ecaps.append(ecap)
 
-    print("贴片电解电容3D模型生成完毕！")
+        print("贴片电解电容3D模型生成完毕！")
 
-    # 创建照明
-    print("创建照明...")
-    sun, fill_light = create_lighting()
-    collection.objects.link(sun)
-    collection.objects.link(fill_light)
-    
-    # 创建相机
-    print("创建相机...")
-    camera = create_camera()
-    collection.objects.link(camera)
+        # 创建照明
+        print("创建照明...")
+        sun, fill_light = create_lighting()
+        collection.objects.link(sun)
+        collection.objects.link(fill_light)
+    
+        # 创建相机
+        print("创建相机...")
+        camera = create_camera()
+        collection.objects.link(camera)
+        bpy.context.scene.collection.children.link(collection)
     
     # 设置渲染设置
     bpy.context.scene.render.engine = 'CYCLES'
@@ -125,7 +125,7 @@ def create_esp12f_model():
     antenna_collection = bpy.data.collections.new("ESP12F_Antenna")
     trace_thickness = 0.035  # 1oz = 0.035mm
     antenna_width = 6
-    antenna_segments = create_esp12f_antenna(pcb_width, antenna_width, 0.5, 0.3, 0.5, trace_thickness, pin_mat, antenna_collection)
+    antenna_segments, _ = create_esp12f_antenna(pcb_width, antenna_width, 0.5, 0.3, 0.5, trace_thickness, pin_mat, antenna_collection)
     for segment in antenna_segments:
         segment.location.x += pcb_length/2 - antenna_width/2
         segment.location.z += pcb_thickness/2 + trace_thickness/2
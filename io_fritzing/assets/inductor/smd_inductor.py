@@ -1,9 +1,8 @@
 import bpy
-import bmesh
-from mathutils import Vector
 from ..utils.scene import clear_scene, create_lighting, create_camera
 from ..utils.origin import set_origin_to_bottom
 from ..utils.material import create_material
+from ..utils.mesh import create_boxes_mesh
 
 # 定义常见贴片电感封装尺寸（单位：毫米）- 保留所有尺寸
 INDUCTOR_SIZES = {
@@ -45,64 +44,18 @@ def create_smd_inductor_model(size_name='0603'):
     layer_mat = create_material(name="Inductor_Layer", base_color=(0.15, 0.25, 0.15), metallic=0.0, roughness=0.2)
     terminal_mat = create_material(name="Terminal_Metal", base_color=(0.9, 0.9, 0.92), metallic=0.95, roughness=0.15)
     
-    # 1. 创建叠层本体
-    bm_body = bmesh.new()
-    body_size = Vector((body_length, body_width, body_height))
-    bmesh.ops.create_cube(bm_body, size=1.0)
-    for v in bm_body.verts:
-        v.co = v.co * body_size
-    
-    mesh_body = bpy.data.meshes.new("Inductor_Layer_Body")
-    bm_body.to_mesh(mesh_body)
-    obj_body = bpy.data.objects.new("Inductor_Layer_Body", mesh_body)
-    # collection.objects.link(obj_body)
+    # 本体和两个焊端写入同一个网格，材质槽0为本体，1为焊端
+    terminal_size = (terminal_length, terminal_width, terminal_height)
+    terminal_x = (body_length + terminal_length) / 2
+    mesh = create_boxes_mesh(f"SMD_Inductor_{size_name}", [
+        ((body_length, body_width, body_height), (0, 0, 0), 0),
+        (terminal_size, (-terminal_x, 0, 0), 1),
+        (terminal_size, (terminal_x, 0, 0), 1),
+    ])
+    mesh.materials.append(layer_mat)
+    mesh.materials.append(terminal_mat)
+    obj_body = bpy.data.objects.new(f"SMD_Inductor_{size_name}", mesh)
     bpy.context.collection.objects.link(obj_body)
-    obj_body.data.materials.clear()
-    obj_body.data.materials.append(layer_mat)
-    
-    # 2. 创建左侧金属焊端
-    bm_left_terminal = bmesh.new()
-    left_terminal_size = Vector((terminal_length, terminal_width, terminal_height))
-    bmesh.ops.create_cube(bm_left_terminal, size=1.0)
-    for v in bm_left_terminal.verts:
-        v.co = v.co * left_terminal_size
-        v.co.x -= (body_length + terminal_length) / 2
-    
-    mesh_left_terminal = bpy.data.meshes.new("Left_Terminal")
-    bm_left_terminal.to_mesh(mesh_left_terminal)
-    obj_left_terminal = bpy.data.objects.new("Left_Terminal", mesh_left_terminal)
-    # collection.objects.link(obj_left_terminal)
-    bpy.context.collection.objects.link(obj_left_terminal)
-    obj_left_terminal.data.materials.append(terminal_mat)
-    
-    # 3. 创建右侧金属焊端
-    bm_right_terminal = bmesh.new()
-    right_terminal_size = Vector((terminal_length, terminal_width, terminal_height))
-    bmesh.ops.create_cube(bm_right_terminal, size=1.0)
-    for v in bm_right_terminal.verts:
-        v.co = v.co * right_terminal_size
-        v.co.x += (body_length + terminal_length) / 2
-    
-    mesh_right_terminal = bpy.data.meshes.new("Right_Terminal")
-    bm_right_terminal.to_mesh(mesh_right_terminal)
-    obj_right_terminal = bpy.data.objects.new("Right_Terminal", mesh_right_terminal)
-    # collection.objects.link(obj_right_terminal)
-    bpy.context.collection.objects.link(obj_right_terminal)
-    obj_right_terminal.data.materials.append(terminal_mat)
-    
-    # 清理bmesh
-    bm_body.free()
-    bm_left_terminal.free()
-    bm_right_terminal.free()
-    
-    # 合并所有对象
-    bpy.ops.object.select_all(action='DESELECT')
-    obj_body.select_set(True)
-    obj_left_terminal.select_set(True)
-    obj_right_terminal.select_set(True)
-    bpy.context.view_layer.objects.active = obj_body
-    bpy.ops.object.join()
-    obj_body.name = f"SMD_Inductor_{size_name}"
 
     set_origin_to_bottom(obj_body)
 
@@ -92,16 +92,22 @@ def apply_all_modifiers(obj=None):
             objects = bpy.context.scene.objects
     
     for obj in objects:
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        if bpy.context:
-            bpy.context.view_layer.objects.active = obj
+        # 大部分物体没有修改器，直接跳过
+        modifiers = obj.modifiers
+        if not modifiers:
+            continue
         
-        for modifier in list(obj.modifiers):
-            try:
-                bpy.ops.object.modifier_apply(modifier=modifier.name)
-            except:
-                obj.modifiers.remove(modifier)
+        # modifier_apply只作用于上下文中的物体，用temp_override指定，不修改选择和活动物体
+        with bpy.context.temp_override(object=obj, active_object=obj):
+            while modifiers:
+                modifier = modifiers[0]
+                try:
+                    bpy.ops.object.modifier_apply(modifier=modifier.name)
+                except:
+                    pass
+                # 应用失败的修改器直接移除，避免死循环
+                if modifiers and modifiers[0] == modifier:
+                    modifiers.remove(modifier)
 
 def create_resistor_body():
     """创建排阻主体"""
@@ -374,13 +380,6 @@ def create_collection_and_organize(body, pins, marking):
                 bpy.context.scene.collection.objects.unlink(obj)
             collection.objects.link(obj)
     
-    # 选择所有对象
-    bpy.ops.object.select_all(action='DESELECT')
-    for obj in objects_to_move:
-        obj.select_set(True)
-    bpy.context.active_object = body
-    bpy.ops.object.join()
-    
     return collection
 
 def join_objects(body, pins, marking):
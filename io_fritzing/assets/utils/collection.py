@@ -16,10 +16,5 @@ def create_collection_and_organize(name="Package", objects=[]):
         # 将对象添加到新组合中
         for obj in objects:
             collection.objects.link(obj)
-        
-        # 选择所有对象
-        bpy.ops.object.select_all(action='DESELECT')
-        for obj in objects:
-            obj.select_set(True)
     
     return collection
@@ -1,27 +1,85 @@
 import bpy
+
+# 已创建材质的缓存，键为材质名和全部参数
+_MATERIAL_CACHE = {}
+
+# 材质模板，名称以点开头不在界面中显示
+_BSDF_TEMPLATE_NAME = ".BSDF_Template"
+_BSDF_TEMPLATE = None
+
+
+def _get_bsdf_template():
+    """返回只有PBR材质节点和输出节点的模板材质，新材质复制它而不是重新建节点"""
+    global _BSDF_TEMPLATE
+    try:
+        # 模板可能因重名被改成.BSDF_Template.001，按它实际的名称检查
+        if _BSDF_TEMPLATE is not None and bpy.data.materials.get(_BSDF_TEMPLATE.name) == _BSDF_TEMPLATE:
+            return _BSDF_TEMPLATE
+    except ReferenceError:
+        pass
+
+    # 插件重新加载后全局变量被重置，但之前的模板还在bpy.data中，直接复用
+    existing = bpy.data.materials.get(_BSDF_TEMPLATE_NAME)
+    if existing is not None and existing.node_tree and 'Principled BSDF' in existing.node_tree.nodes:
+        _BSDF_TEMPLATE = existing
+        return existing
+
+    template = bpy.data.materials.new(name=_BSDF_TEMPLATE_NAME)
+    template.use_nodes = True
+    nodes = template.node_tree.nodes
+    # 清除默认节点
+    nodes.clear()
+    bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
+    bsdf.name = 'Principled BSDF'
+    output = nodes.new(type='ShaderNodeOutputMaterial')
+    output.location = (400, 0)
+    template.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
+
+    _BSDF_TEMPLATE = template
+    return template
+
 # 材质创建函数
 def create_material(name, base_color, metallic=0.0, roughness=0.8, weight=None, ior=None, emission_color=None, emission_strength=0.0, alpha=1.0) -> bpy.types.Material:
+    key = (
+        name,
+        tuple(base_color) if base_color is not None else None,
+        metallic,
+        roughness,
+        weight,
+        ior,
+        tuple(emission_color) if emission_color else None,
+        emission_strength,
+        alpha,
+    )
+    cached = _MATERIAL_CACHE.get(key)
+    if cached is not None:
+        try:
+            # 材质可能已被删除或改名
+            if bpy.data.materials.get(cached.name) == cached:
+                return cached
+        except ReferenceError:
+            pass
+        del _MATERIAL_CACHE[key]
+
     if name in bpy.data.materials:
         return bpy.data.materials[name]
     
-    mat = bpy.data.materials.new(name=name)
+    mat = _get_bsdf_template().copy()
+    mat.name = name
+    rgba = None
     if base_color is not None and len(base_color) == 3:
-        mat.diffuse_color = (*base_color, 1.0)
+        rgba = (*base_color, 1.0)
     elif base_color is not None and len(base_color) == 4:
-        mat.diffuse_color = base_color
-    mat.use_nodes = True
+        rgba = tuple(base_color)
+    # 实体视图的材质着色使用diffuse_color，渲染使用节点的Base Color
+    if rgba is not None:
+        mat.diffuse_color = rgba
     
-    # 清除默认节点
     if mat.node_tree:
-        nodes = mat.node_tree.nodes
-        nodes.clear()
-        
-        # 创建PBR材质节点
-        bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
-        if base_color is not None and len(base_color) == 3:
-            bsdf.inputs['Base Color'].__setattr__('default_value', (*base_color, 1.0))
-        elif base_color is not None and len(base_color) == 4:
-            bsdf.inputs['Base Color'].__setattr__('default_value', base_color)
+        # 模板中已有PBR材质节点和输出节点，只需修改输入值
+        bsdf = mat.node_tree.nodes['Principled BSDF']
+        if rgba is not None:
+            bsdf.inputs['Base Color'].__setattr__('default_value', rgba)
         bsdf.inputs['Metallic'].__setattr__('default_value', metallic)
         bsdf.inputs['Roughness'].__setattr__('default_value', roughness)
 
@@ -31,11 +89,6 @@ def create_material(name, base_color, metallic=0.0, roughness=0.8, weight=None,
             bsdf.inputs['Transmission Weight'].__setattr__('default_value', weight)
         if ior is not None:
             bsdf.inputs['IOR'].__setattr__('default_value', ior)
-        
-        output = nodes.new(type='ShaderNodeOutputMaterial')
-        if weight is not None or ior is not None:
-            output.location = (400, 0)
-        mat.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
 
         if emission_color:
             bsdf.inputs['Emission Color'].default_value = (*emission_color, 1.0)
@@ -46,4 +99,5 @@ def create_material(name, base_color, metallic=0.0, roughness=0.8, weight=None,
             mat.shadow_method = 'CLIP'
             mat.show_transparent_back = True
 
+    _MATERIAL_CACHE[key] = mat
     return mat
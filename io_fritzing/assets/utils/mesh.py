@@ -0,0 +1,471 @@
+import bpy
+import numpy as np
+
+# Blender自带的Python没有numba，没有安装时使用numpy广播
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# 单位立方体的顶点，按x、y、z的二进制位排列，中心在原点
+# 导入时建好只读数组，各处直接参与运算，不再每次调用都重新转换
+UNIT_CUBE_VERTS = np.array([(x - 0.5, y - 0.5, z - 0.5) for z in (0, 1) for y in (0, 1) for x in (0, 1)], dtype=np.float32)
+UNIT_CUBE_VERTS.setflags(write=False)
+
+# 单位立方体的6个四边形面，法线朝外: -z, +z, -y, +y, -x, +x
+UNIT_CUBE_FACES = np.array([(0, 2, 3, 1), (4, 5, 7, 6), (0, 1, 5, 4), (2, 6, 7, 3), (0, 4, 6, 2), (1, 3, 7, 5)], dtype=np.int32)
+UNIT_CUBE_FACES.setflags(write=False)
+
+
+def _box_verts_numpy(unit, sizes, centers):
+    """把单位立方体缩放并平移到每个长方体，返回(count, 8, 3)的数组"""
+    return unit[None, :, :] * sizes[:, None, :] + centers[:, None, :]
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _box_verts(unit, sizes, centers):
+        """与_box_verts_numpy相同，用一个融合的循环写出全部顶点"""
+        out = np.empty((sizes.shape[0], unit.shape[0], 3), dtype=np.float32)
+        for box in range(sizes.shape[0]):
+            for vert in range(unit.shape[0]):
+                for axis in range(3):
+                    out[box, vert, axis] = unit[vert, axis] * sizes[box, axis] + centers[box, axis]
+        return out
+else:
+    _box_verts = _box_verts_numpy
+
+
+def create_box_mesh(name, size, center=(0, 0, 0)):
+    """用numpy和foreach_set直接写入长方体网格数据，不经过bmesh"""
+    return create_boxes_mesh(name, [(size, center, 0)])
+
+
+def create_boxes_mesh(name, boxes):
+    """
+    把多个长方体一次写入同一个网格
+    boxes为(size, center, material_index)的列表，material_index对应网格的材质槽
+    """
+    count = len(boxes)
+    sizes = np.array([box[0] for box in boxes], dtype=np.float32)
+    centers = np.array([box[1] for box in boxes], dtype=np.float32)
+    verts = _box_verts(UNIT_CUBE_VERTS, sizes, centers)
+    faces = UNIT_CUBE_FACES[None, :, :] + (np.arange(count, dtype=np.int32) * 8)[:, None, None]
+    material_indices = np.repeat(np.array([box[2] for box in boxes], dtype=np.int32), len(UNIT_CUBE_FACES))
+
+    mesh = bpy.data.meshes.new(name)
+    write_quads(mesh, verts.reshape(-1, 3), faces.reshape(-1, 4))
+    mesh.polygons.foreach_set("material_index", material_indices)
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def write_quads(mesh, verts, faces):
+    """用foreach_set把顶点和四边形面一次写入空网格，verts为(n, 3)，faces为(m, 4)的numpy数组"""
+    mesh.vertices.add(len(verts))
+    mesh.loops.add(faces.size)
+    mesh.polygons.add(len(faces))
+    # 已经是float32和int32时asarray不会复制，foreach_set可以直接拷贝缓冲区
+    mesh.vertices.foreach_set("co", np.asarray(verts, dtype=np.float32).ravel())
+    mesh.loops.foreach_set("vertex_index", np.asarray(faces, dtype=np.int32).ravel())
+    # Blender 4.x中loop_total由loop_start推出
+    mesh.polygons.foreach_set("loop_start", np.arange(0, faces.size, 4, dtype=np.int32))
+
+
+_UNIT_CUBE_MESH = None
+
+
+def get_unit_cube_mesh():
+    """
+    返回共用的单位立方体模板网格，中心在原点，边长为1
+    各个长方体物体用scale和location区分，合并时用变换矩阵读取，不再各自生成网格
+    模板带一个空的材质槽，物体把槽设为link='OBJECT'后可以各自指定材质而不修改模板
+    """
+    global _UNIT_CUBE_MESH
+    try:
+        # 模板网格可能已被删除
+        if _UNIT_CUBE_MESH is not None and bpy.data.meshes.get(_UNIT_CUBE_MESH.name) == _UNIT_CUBE_MESH:
+            return _UNIT_CUBE_MESH
+    except ReferenceError:
+        pass
+
+    mesh = create_box_mesh("Cube_Template", (1, 1, 1))
+    mesh.materials.append(None)
+    _UNIT_CUBE_MESH = mesh
+    return mesh
+
+
+def _torus_verts_numpy(major_radius, minor_radius, major_segments, minor_segments):
+    """按(R + r·cosφ)(cosθ, sinθ) + r·sinφ计算圆环顶点，返回(major_segments * minor_segments, 3)的数组"""
+    theta = np.linspace(0, 2 * np.pi, major_segments, endpoint=False)[:, None]
+    phi = np.linspace(0, 2 * np.pi, minor_segments, endpoint=False)[None, :]
+    radius = major_radius + minor_radius * np.cos(phi)
+    verts = np.stack(np.broadcast_arrays(radius * np.cos(theta), radius * np.sin(theta), minor_radius * np.sin(phi)), axis=-1)
+    return verts.reshape(-1, 3).astype(np.float32)
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _torus_verts(major_radius, minor_radius, major_segments, minor_segments):
+        """与_torus_verts_numpy相同，用两层循环直接填充顶点缓冲区"""
+        out = np.empty((major_segments * minor_segments, 3), dtype=np.float32)
+        for i in range(major_segments):
+            theta = 2.0 * np.pi * i / major_segments
+            cos_theta = np.cos(theta)
+            sin_theta = np.sin(theta)
+            for j in range(minor_segments):
+                phi = 2.0 * np.pi * j / minor_segments
+                radius = major_radius + minor_radius * np.cos(phi)
+                vert = i * minor_segments + j
+                out[vert, 0] = radius * cos_theta
+                out[vert, 1] = radius * sin_theta
+                out[vert, 2] = minor_radius * np.sin(phi)
+        return out
+else:
+    _torus_verts = _torus_verts_numpy
+
+
+# 圆环模板网格的缓存，键为(major_radius, minor_radius, major_segments, minor_segments)
+_TORUS_MESH_CACHE = {}
+
+
+def get_torus_mesh(major_radius, minor_radius, major_segments=48, minor_segments=12):
+    """
+    返回圆环模板网格，拓扑与primitive_torus_add相同
+    同样参数的圆环只生成一次，用bm.from_mesh追加到其它网格中使用
+    """
+    key = (major_radius, minor_radius, major_segments, minor_segments)
+    mesh = _TORUS_MESH_CACHE.get(key)
+    if mesh is not None:
+        try:
+            # 模板网格可能已被删除
+            if bpy.data.meshes.get(mesh.name) == mesh:
+                return mesh
+        except ReferenceError:
+            pass
+
+    verts = _torus_verts(float(major_radius), float(minor_radius), major_segments, minor_segments)
+
+    i = np.arange(major_segments, dtype=np.int32)[:, None]
+    j = np.arange(minor_segments, dtype=np.int32)[None, :]
+    next_i = (i + 1) % major_segments
+    next_j = (j + 1) % minor_segments
+    faces = np.stack(np.broadcast_arrays(
+        i * minor_segments + j,
+        next_i * minor_segments + j,
+        next_i * minor_segments + next_j,
+        i * minor_segments + next_j,
+    ), axis=-1)
+
+    mesh = bpy.data.meshes.new("Torus_Template")
+    write_quads(mesh, verts, faces.reshape(-1, 4))
+    mesh.update(calc_edges=True)
+    _TORUS_MESH_CACHE[key] = mesh
+    return mesh
+
+
+def create_cylinder_mesh(name, segments, radius, depth):
+    """
+    用numpy三角函数生成圆柱网格，中心在原点，轴沿z方向
+    拓扑与primitive_cylinder_add相同：侧面为四边形，两端为n边形
+    """
+    return create_cylinders_mesh(name, [(segments, radius, depth, (0, 0, 0))])
+
+
+_CYLINDER_MESH_CACHE = {}
+
+
+def get_cylinder_mesh(segments, radius, depth):
+    """
+    返回圆柱模板网格，中心在原点，轴沿z方向
+    同样参数的圆柱只生成一次，多个物体可以共用，需要修改时先copy()
+    """
+    key = (segments, radius, depth)
+    mesh = _CYLINDER_MESH_CACHE.get(key)
+    if mesh is not None:
+        try:
+            # 模板网格可能已被删除
+            if bpy.data.meshes.get(mesh.name) == mesh:
+                return mesh
+        except ReferenceError:
+            pass
+
+    mesh = create_cylinder_mesh("Cylinder_Template", segments, radius, depth)
+    _CYLINDER_MESH_CACHE[key] = mesh
+    return mesh
+
+
+# 棱柱拓扑的缓存，键为边数，同样边数的棱柱和圆柱只计算一次索引数组
+_PRISM_TOPOLOGY_CACHE = {}
+
+
+def _prism_topology(segments, vert_offset=0, loop_offset=0):
+    """
+    返回棱柱的loops和loop_start数组，顶点前segments个为底面，后segments个为顶面，均逆时针排列
+    侧面为四边形，两端为n边形
+    """
+    topology = _PRISM_TOPOLOGY_CACHE.get(segments)
+    if topology is None:
+        index = np.arange(segments, dtype=np.int32)
+        following = (index + 1) % segments
+        sides = np.column_stack([index, following, following + segments, index + segments])
+        # 底面顺时针排列使法线朝下，顶面逆时针排列使法线朝上
+        loops = np.concatenate([sides.ravel(), index[::-1], index + segments])
+        loop_starts = np.concatenate([np.arange(0, 4 * segments, 4, dtype=np.int32), np.array([4 * segments, 5 * segments], dtype=np.int32)])
+        topology = _PRISM_TOPOLOGY_CACHE[segments] = (loops, loop_starts)
+    loops, loop_starts = topology
+    # 加上偏移得到新数组，缓存的模板不会被修改
+    return loops + vert_offset, loop_starts + loop_offset
+
+
+def create_polygons_mesh(name, verts, loops, loop_starts):
+    """用foreach_set把顶点和任意边数的面一次写入新网格，loops为所有面的顶点索引，loop_starts为每个面在loops中的起点"""
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(verts))
+    mesh.loops.add(len(loops))
+    mesh.polygons.add(len(loop_starts))
+    mesh.vertices.foreach_set("co", np.asarray(verts, dtype=np.float32).ravel())
+    mesh.loops.foreach_set("vertex_index", np.asarray(loops, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_start", np.asarray(loop_starts, dtype=np.int32))
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def create_prism_mesh(name, outline, z_min, z_max):
+    """
+    把逆时针排列的xy轮廓沿z方向拉伸成直棱柱网格
+    用于布尔切角这类结果可以直接写出的形状
+    """
+    outline = np.asarray(outline, dtype=np.float32)
+    segments = len(outline)
+    bottom = np.column_stack([outline, np.full(segments, z_min, dtype=np.float32)])
+    top = np.column_stack([outline, np.full(segments, z_max, dtype=np.float32)])
+    loops, loop_starts = _prism_topology(segments)
+    return create_polygons_mesh(name, np.concatenate([bottom, top]), loops, loop_starts)
+
+
+def _arc_prism_verts_numpy(radius, start_angle, end_angle, segments, z_min, z_max):
+    """
+    弓形棱柱的顶点：前segments + 1个为顶面外弧，接着同样数量的底面外弧，最后是弦中点的顶面和底面顶点
+    """
+    count = segments + 1
+    angles = np.linspace(start_angle, end_angle, count)
+    xy = np.column_stack([np.cos(angles), np.sin(angles)]) * radius
+    chord_midpoint = (xy[0] + xy[-1]) / 2
+    verts = np.empty((2 * count + 2, 3), dtype=np.float32)
+    verts[:count, :2] = xy
+    verts[:count, 2] = z_max
+    verts[count:2 * count, :2] = xy
+    verts[count:2 * count, 2] = z_min
+    verts[2 * count] = (chord_midpoint[0], chord_midpoint[1], z_max)
+    verts[2 * count + 1] = (chord_midpoint[0], chord_midpoint[1], z_min)
+    return verts
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _arc_prism_verts(radius, start_angle, end_angle, segments, z_min, z_max):
+        """与_arc_prism_verts_numpy相同，用一个循环直接填充顶点缓冲区"""
+        count = segments + 1
+        verts = np.empty((2 * count + 2, 3), dtype=np.float32)
+        for i in range(count):
+            angle = start_angle + (end_angle - start_angle) * i / segments
+            x = np.cos(angle) * radius
+            y = np.sin(angle) * radius
+            verts[i, 0] = x
+            verts[i, 1] = y
+            verts[i, 2] = z_max
+            verts[i + count, 0] = x
+            verts[i + count, 1] = y
+            verts[i + count, 2] = z_min
+        mid_x = (verts[0, 0] + verts[count - 1, 0]) / 2
+        mid_y = (verts[0, 1] + verts[count - 1, 1]) / 2
+        verts[2 * count, 0] = mid_x
+        verts[2 * count, 1] = mid_y
+        verts[2 * count, 2] = z_max
+        verts[2 * count + 1, 0] = mid_x
+        verts[2 * count + 1, 1] = mid_y
+        verts[2 * count + 1, 2] = z_min
+        return verts
+else:
+    _arc_prism_verts = _arc_prism_verts_numpy
+
+
+def create_arc_prism_mesh(name, radius, start_angle, end_angle, segments, z_min, z_max):
+    """
+    创建弓形棱柱网格：圆弧从start_angle逆时针到end_angle，用弦封闭，在z_min和z_max之间拉伸
+    外弧面和弦上的两个侧面为四边形，顶面和底面为以弦中点为中心的三角扇
+    """
+    count = segments + 1
+    verts = _arc_prism_verts(float(radius), float(start_angle), float(end_angle), segments, float(z_min), float(z_max))
+
+    top = np.arange(segments, dtype=np.int32)
+    bottom = top + count
+    mid_top = np.full(segments, 2 * count, dtype=np.int32)
+    mid_bottom = np.full(segments, 2 * count + 1, dtype=np.int32)
+    quads = np.concatenate([
+        np.column_stack([bottom, bottom + 1, top + 1, top]),
+        np.array([(2 * count - 1, 2 * count + 1, 2 * count, count - 1), (2 * count + 1, count, 0, 2 * count)], dtype=np.int32),
+    ])
+    triangles = np.concatenate([
+        np.column_stack([mid_top, top, top + 1]),
+        np.column_stack([mid_bottom, bottom + 1, bottom]),
+    ])
+    loops = np.concatenate([quads.ravel(), triangles.ravel()])
+    loop_starts = np.concatenate([np.arange(0, quads.size, 4, dtype=np.int32), quads.size + np.arange(0, triangles.size, 3, dtype=np.int32)])
+    return create_polygons_mesh(name, verts, loops, loop_starts)
+
+
+def create_cylinders_mesh(name, cylinders):
+    """
+    把多个轴沿z方向的圆柱一次写入同一个网格
+    cylinders为(segments, radius, depth, center)的列表
+    """
+    all_verts = []
+    all_loops = []
+    all_loop_starts = []
+    vert_offset = 0
+    loop_offset = 0
+    for segments, radius, depth, center in cylinders:
+        theta = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+        verts = np.empty((2 * segments, 3), dtype=np.float32)
+        verts[:, 0] = np.tile(radius * np.cos(theta), 2)
+        verts[:, 1] = np.tile(radius * np.sin(theta), 2)
+        verts[:segments, 2] = -depth / 2
+        verts[segments:, 2] = depth / 2
+        verts += np.asarray(center, dtype=np.float32)
+        all_verts.append(verts)
+
+        loops, loop_starts = _prism_topology(segments, vert_offset, loop_offset)
+        all_loops.append(loops)
+        all_loop_starts.append(loop_starts)
+        vert_offset += 2 * segments
+        loop_offset += 6 * segments
+
+    return create_polygons_mesh(name, np.concatenate(all_verts), np.concatenate(all_loops), np.concatenate(all_loop_starts))
+
+
+def create_object(name, mesh, location=(0, 0, 0), collection=None):
+    """用已有网格创建物体并链接到集合，默认为当前集合"""
+    obj = bpy.data.objects.new(name, mesh)
+    obj.location = location
+    if collection is None and bpy.context:
+        collection = bpy.context.collection
+    if collection is not None:
+        collection.objects.link(obj)
+    return obj
+
+
+def create_mesh_object(name, bm, location=(0, 0, 0), collection=None):
+    """把bmesh写入新网格并创建物体，不经过bpy.ops，bm会被释放"""
+    mesh = bpy.data.meshes.new(name)
+    bm.to_mesh(mesh)
+    bm.free()
+    return create_object(name, mesh, location, collection)
+
+
+def _mesh_arrays(mesh, matrix=None):
+    """用foreach_get读出网格的顶点、loops、loop_start和材质索引，matrix不为None时顶点先做变换"""
+    verts = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", verts)
+    verts = verts.reshape(-1, 3)
+    if matrix is not None:
+        matrix = np.array(matrix, dtype=np.float32)
+        verts = verts @ matrix[:3, :3].T + matrix[:3, 3]
+    loops = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loops)
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    material_indices = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", material_indices)
+    return verts, loops, loop_starts, material_indices
+
+
+def merge_meshes(name, parts):
+    """
+    把多个网格的几何体拼接成一个新网格，不创建中间物体，也不经过bmesh和bpy.ops
+    parts为(mesh, matrix, material_index)的列表，matrix为None时不变换，material_index为该部件所有面的材质槽
+    原网格不会被修改，可以是共用的模板网格
+    """
+    all_verts = []
+    all_loops = []
+    all_loop_starts = []
+    all_material_indices = []
+    vert_offset = 0
+    loop_offset = 0
+    for mesh, matrix, material_index in parts:
+        verts, loops, loop_starts, _ = _mesh_arrays(mesh, matrix)
+        all_verts.append(verts)
+        all_loops.append(loops + vert_offset)
+        all_loop_starts.append(loop_starts + loop_offset)
+        all_material_indices.append(np.full(len(loop_starts), material_index, dtype=np.int32))
+        vert_offset += len(verts)
+        loop_offset += len(loops)
+
+    merged = create_polygons_mesh(name, np.concatenate(all_verts), np.concatenate(all_loops), np.concatenate(all_loop_starts))
+    merged.polygons.foreach_set("material_index", np.concatenate(all_material_indices))
+    return merged
+
+
+def join_objects(target, objects):
+    """
+    用foreach_get读出各物体的网格数组并拼接到target中，代替bpy.ops.object.join
+    合并后的其它物体和它们的网格会被删除，材质槽会重新映射
+    """
+    verts, loops, loop_starts, material_indices = _mesh_arrays(target.data)
+    smooth = np.empty(len(loop_starts), dtype=bool)
+    target.data.polygons.foreach_get("use_smooth", smooth)
+    all_verts = [verts]
+    all_loops = [loops]
+    all_loop_starts = [loop_starts]
+    all_material_indices = [material_indices]
+    all_smooth = [smooth]
+    vert_offset = len(verts)
+    loop_offset = len(loops)
+    # 新建的物体还没有经过depsgraph更新，matrix_world不可靠，这里用matrix_basis
+    target_inverted = target.matrix_basis.inverted()
+
+    for obj in objects:
+        if obj is target or obj.type != 'MESH':
+            continue
+        verts, loops, loop_starts, material_indices = _mesh_arrays(obj.data, target_inverted @ obj.matrix_basis)
+        smooth = np.empty(len(loop_starts), dtype=bool)
+        obj.data.polygons.foreach_get("use_smooth", smooth)
+
+        # 把物体的材质槽映射到target的材质槽
+        slots = []
+        for material in obj.data.materials:
+            if material not in target.data.materials[:]:
+                target.data.materials.append(material)
+            slots.append(target.data.materials[:].index(material))
+        if slots and len(material_indices):
+            material_indices = np.array(slots, dtype=np.int32)[np.minimum(material_indices, len(slots) - 1)]
+
+        all_verts.append(verts)
+        all_loops.append(loops + vert_offset)
+        all_loop_starts.append(loop_starts + loop_offset)
+        all_material_indices.append(material_indices)
+        all_smooth.append(smooth)
+        vert_offset += len(verts)
+        loop_offset += len(loops)
+
+        old_mesh = obj.data
+        bpy.data.objects.remove(obj)
+        if old_mesh.users == 0:
+            bpy.data.meshes.remove(old_mesh)
+
+    # 清空target原有的几何体后一次写回，材质槽保持不变
+    mesh = target.data
+    mesh.clear_geometry()
+    loops = np.concatenate(all_loops)
+    loop_starts = np.concatenate(all_loop_starts)
+    mesh.vertices.add(vert_offset)
+    mesh.loops.add(len(loops))
+    mesh.polygons.add(len(loop_starts))
+    mesh.vertices.foreach_set("co", np.concatenate(all_verts).ravel())
+    mesh.loops.foreach_set("vertex_index", loops)
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    mesh.polygons.foreach_set("material_index", np.concatenate(all_material_indices))
+    mesh.polygons.foreach_set("use_smooth", np.concatenate(all_smooth))
+    mesh.update(calc_edges=True)
+    return target
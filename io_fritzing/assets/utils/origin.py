@@ -1,6 +1,6 @@
 import bpy
 import bmesh
-from mathutils import Vector
+from mathutils import Matrix, Vector
 
 # 设置原点到几何中心
 def set_origin_to_geometry(obj):
@@ -17,7 +17,24 @@ def set_origin_to_geometry(obj):
 
 # 设置原点到底部中心
 def set_origin_to_bottom(obj):
-    """设置原点到物体的底部中心"""
+    """设置原点到物体的底部中心，网格物体直接修改数据，不经过选择和bpy.ops"""
+    if obj.type == 'MESH' and obj.data.users == 1 and len(obj.data.vertices) > 0:
+        import numpy as np
+
+        # 新建的物体还没有经过depsgraph更新，bound_box不可靠，这里直接读取顶点坐标
+        coords = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+        obj.data.vertices.foreach_get("co", coords)
+        coords = coords.reshape(-1, 3)
+        lower = coords.min(axis=0)
+        upper = coords.max(axis=0)
+        bottom_center_local = Vector(((lower[0] + upper[0]) / 2, (lower[1] + upper[1]) / 2, lower[2]))
+
+        # 网格反向平移，物体正向平移，几何体在世界坐标中保持不动
+        obj.data.transform(Matrix.Translation(-bottom_center_local))
+        obj.matrix_basis = obj.matrix_basis @ Matrix.Translation(bottom_center_local)
+        obj.data.update()
+        return obj
+
     bpy.ops.object.select_all(action='DESELECT')
     obj.select_set(True)
     if bpy.context:
@@ -1,4 +1,27 @@
 import bpy
+import math
+from contextlib import contextmanager
+
+# 设置毫米单位，单位已经正确时不再修改，避免重复刷新界面
+def setup_units(scene):
+    unit_settings = scene.unit_settings
+    if (unit_settings.system != 'METRIC'
+            or unit_settings.length_unit != 'MILLIMETERS'
+            or not math.isclose(unit_settings.scale_length, 0.001, rel_tol=1e-6)):
+        unit_settings.system = 'METRIC'
+        unit_settings.length_unit = 'MILLIMETERS'
+        unit_settings.scale_length = 0.001
+
+# 批量创建模型时关闭全局撤销，bpy.ops不再逐个压入撤销步骤，结束后恢复原设置
+@contextmanager
+def suspend_undo():
+    edit = bpy.context.preferences.edit
+    use_global_undo = edit.use_global_undo
+    edit.use_global_undo = False
+    try:
+        yield
+    finally:
+        edit.use_global_undo = use_global_undo
 
 # 清理场景
 def clear_scene(center_x_offset=0, center_y_offset=0):
@@ -8,10 +31,7 @@ def clear_scene(center_x_offset=0, center_y_offset=0):
         bpy.ops.object.select_all(action='SELECT')
         bpy.ops.object.delete(use_global=False, confirm=False)
             
-        scene = bpy.context.scene
-        scene.unit_settings.system = 'METRIC'
-        scene.unit_settings.length_unit = 'MILLIMETERS'
-        scene.unit_settings.scale_length = 0.001
+        setup_units(bpy.context.scene)
 
         area_3d = None
         for area in bpy.context.screen.areas:
@@ -26,35 +46,36 @@ def clear_scene(center_x_offset=0, center_y_offset=0):
             # Warp the cursor to the center of the 3D Viewport
             bpy.context.window.cursor_warp(center_x, center_y)
 
+def _create_scene_object(name, data, location):
+    """用数据块直接创建物体并链接到当前集合，与bpy.ops添加物体的位置相同，但不依赖活动物体"""
+    obj = bpy.data.objects.new(name, data)
+    obj.location = location
+    bpy.context.collection.objects.link(obj)
+    return obj
+
 def create_lighting():
     """创建照明"""
     if bpy.context is not None:
         # 主光源
-        bpy.ops.object.light_add(type='SUN', location=(10, 10, 20))
-        sun = bpy.context.active_object
-        if sun is not None:
-            setattr(sun.data, "energy", 2.0)
-        setattr(sun, "name", "Main_Sun_Light")
+        sun_data = bpy.data.lights.new("Main_Sun_Light", type='SUN')
+        sun_data.energy = 2.0
+        sun = _create_scene_object("Main_Sun_Light", sun_data, (10, 10, 20))
         
         # 填充光
-        bpy.ops.object.light_add(type='AREA', location=(-10, -10, 15))
-        fill_light = bpy.context.active_object
-        if fill_light is not None:
-            setattr(fill_light.data, "energy", 1.0)
-            setattr(fill_light.data, "size", 5.0)
-            fill_light.name = "Fill_Light"
+        fill_data = bpy.data.lights.new("Fill_Light", type='AREA')
+        fill_data.energy = 1.0
+        fill_data.size = 5.0
+        fill_light = _create_scene_object("Fill_Light", fill_data, (-10, -10, 15))
     
     return sun, fill_light
 
 def create_camera():
     """创建相机"""
     if bpy.context is not None:
-        bpy.ops.object.camera_add(location=(15, -15, 10))
-        camera = bpy.context.active_object
-        setattr(camera, "name", "Main_Camera")
+        camera = _create_scene_object("Main_Camera", bpy.data.cameras.new("Main_Camera"), (15, -15, 10))
         
         # 指向场景中心
-        setattr(camera, "rotation_euler", (1.047, 0, 0.785))  # 约60度俯角，45度方位角
+        camera.rotation_euler = (1.047, 0, 0.785)  # 约60度俯角，45度方位角
         
         # 设置活动相机
         bpy.context.scene.camera = camera
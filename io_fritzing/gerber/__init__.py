@@ -31,6 +31,8 @@ classes = (
     GerberDrillHoles,
 )
 
+register_classes, unregister_classes = bpy.utils.register_classes_factory(classes)
+
 def register():
     try:
         # 先尝试注销
@@ -46,8 +48,7 @@ def register():
         # 如果仍然失败，可能是其他问题
         print(f"Warning: Could not register translations: {e}")
     
-    for cls in classes:
-        bpy.utils.register_class(cls)
+    register_classes()
     bpy.types.TOPBAR_MT_file_import.append(menu_import)
 
     """注册Gerber模块"""
@@ -67,8 +68,7 @@ def unregister():
         # 如果没有注册，忽略错误
         pass
 
-    for cls in classes:
-        bpy.utils.unregister_class(cls)
+    unregister_classes()
     bpy.types.TOPBAR_MT_file_import.remove(menu_import)
 
     """注销Gerber模块"""
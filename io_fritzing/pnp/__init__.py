@@ -5,17 +5,17 @@ from .pnp_import import register as register_pnp_settings, unregister as unregis
 classes = (
 )
 
+register_classes, unregister_classes = bpy.utils.register_classes_factory(classes)
+
 
 def register():
     bpy.app.translations.register(__name__, langs)
-    for cls in classes:
-        bpy.utils.register_class(cls)
+    register_classes()
     register_pnp_settings()
 
 
 def unregister():
-    for cls in classes:
-        bpy.utils.unregister_class(cls)
+    unregister_classes()
     unregister_pnp_settings()
     bpy.app.translations.unregister(__name__)
 
@@ -54,6 +54,8 @@ classes = (
     # TestBoolTool,
 )
 
+register_classes, unregister_classes = bpy.utils.register_classes_factory(classes)
+
 def register():
     try:
         # 先尝试注销
@@ -69,8 +71,7 @@ def register():
         # 如果仍然失败，可能是其他问题
         print(f"Warning: Could not register translations: {e}")
     
-    for cls in classes:
-        bpy.utils.register_class(cls)
+    register_classes()
     bpy.types.TOPBAR_MT_file_import.append(menu_import)
     FritzingIORegister()
     BoardSettingsRegister()
@@ -84,8 +85,7 @@ def unregister():
         # 如果没有注册，忽略错误
         pass
 
-    for cls in classes:
-        bpy.utils.unregister_class(cls)
+    unregister_classes()
     bpy.types.TOPBAR_MT_file_import.remove(menu_import)
     FritzingIOUnregister()
     BoardSettingsUnregister()
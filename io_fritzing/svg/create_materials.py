@@ -34,14 +34,34 @@ class CreateMaterials(Operator):
                     if copper_color_setting == color['name']:
                         copper_color = color["rgba"]
             
+            # layer class -> (material name, rgba, metallic, specular, roughness)
+            layer_materials = {
+                "outline": ("outline", board_color, 0.234, 0.235, 0.202),
+                "topsilk": ("silk", silk_color, 1, 0.5, 0.2),
+                "bottomsilk": ("silk", silk_color, 1, 0.5, 0.2),
+                "top": ("copper", copper_color, 1, 0.5, 0.2),
+                "bottom": ("copper", copper_color, 1, 0.5, 0.2),
+            }
+            # layers with the same look share one material datablock
+            materials = {}
             svgLayers = importdata.svgLayers
             for layerClass, layer in svgLayers.items():
-                if layerClass == "outline":
-                    create_material(layer, layerClass, board_color, 0.234, 0.235, 0.202)
-                elif layerClass == "topsilk" or layerClass == 'bottomsilk':
-                    create_material(layer, layerClass, silk_color, 1, 0.5, 0.2)
-                elif layerClass == "top" or layerClass == "bottom":
-                    create_material(layer, layerClass, copper_color, 1, 0.5, 0.2)
+                material_spec = layer_materials.get(layerClass)
+                if material_spec is None:
+                    continue
+                material_name = material_spec[0]
+                if material_name in materials:
+                    layer.data.materials.append(materials[material_name])
+                else:
+                    materials[material_name] = create_material(layer, *material_spec)
+
+            # assigning materials needs no selection, so switch the viewport shading only once
+            if context and context.screen:
+                for area in context.screen.areas:
+                    if area.type == "VIEW_3D":
+                        for space in area.spaces:
+                            if space.type == "VIEW_3D":
+                                space.shading.type = "SOLID"
         except Exception as e:
             print('--CreateMaterials exception: ' + str(e))
             importdata.error_msg = str(e)
@@ -59,26 +79,12 @@ class CreateMaterials(Operator):
 # @param metallic -a float for the percentage of metallic texture
 # @param specular -a float for the percentage of specular-intensity \(reflected light\)
 # @param roughness -a float for the percentage of roughness in the texture \(surface divisions for specular intensity\)
+# @return the new material
 def create_material(layer, name="material_name", rgba=(0.0, 0.0, 0.0, 1.0), metallic=0.5, specular=0.5, roughness=0.5):
-    # make sure computer thinks the mouse is in the right location, avoid ...poll() errors.
-    if bpy.context is None:
-        return
-    for area in bpy.context.screen.areas: 
-        if area.type == "VIEW_3D":
-            for space in area.spaces: 
-                if space.type == "VIEW_3D" and hasattr(space, 'shading.type'):
-                    setattr(getattr(space, 'shading'), 'type', "MATERIAL")
-
-    bpy.context.view_layer.objects.active = layer
     material = bpy.data.materials.new(name)
     material.diffuse_color = rgba
     material.metallic = metallic
     material.specular_intensity = specular
     material.roughness = roughness
     layer.data.materials.append(material)
-                    
-    for area in bpy.context.screen.areas: 
-        if area.type == "VIEW_3D":
-            for space in area.spaces: 
-                if space.type == "VIEW_3D":
-                    setattr(getattr(space, 'shading'), 'type', "SOLID")
+    return material
@@ -10,7 +10,13 @@ class DrillHoles(Operator):
     def execute(self, context):
         try:
             if bpy.context is not None:
-                joined_layer = bpy.context.view_layer.objects['JoinedLayer']
+                for area in bpy.context.screen.areas:
+                    if area.type == "VIEW_3D":
+                        for space in area.spaces:
+                            if space.type == "VIEW_3D":
+                                setattr(getattr(space, 'shading'), 'type', "SOLID")
+                view_layer = bpy.context.view_layer
+                joined_layer = view_layer.objects['JoinedLayer']
                 drill_layer = None
                 try:
                     drill_layer = importdata.svgLayers['drill']
@@ -20,7 +26,7 @@ class DrillHoles(Operator):
                 if context and hasattr(context.scene, 'drill_algorithm_setting'):
                     algorithm = str(getattr(context.scene, 'drill_algorithm_setting'))
                 if drill_layer and joined_layer:
-                    objects_to_keep = drillHoles(joined_layer, drill_layer=drill_layer, algorithm=algorithm)
+                    objects_to_keep = drillHoles(joined_layer, drill_layer=drill_layer, algorithm=algorithm, view_layer=view_layer)
                     if objects_to_keep is not None:
                         importdata.objects_to_keep = objects_to_keep
         except Exception as e:
@@ -35,15 +41,11 @@ class DrillHoles(Operator):
 ##
 # creates a drill hole through an individual layer of the pcb
 # @param layer_name -the layer to drill the holes in
-def drillHoles(layer, drill_layer, algorithm):
+# @param view_layer -the view layer of the calling operator, looked up once instead of through bpy.context
+def drillHoles(layer, drill_layer, algorithm, view_layer):
     objects_to_keep = []
     if bpy.context is None:
         return
-    for area in bpy.context.screen.areas: 
-        if area.type == "VIEW_3D":
-            for space in area.spaces: 
-                if space.type == "VIEW_3D":
-                    setattr(getattr(space, 'shading'), 'type', "SOLID")
 
     if layer and drill_layer:
         vert_count_before = len(layer.data.vertices)
@@ -54,20 +56,18 @@ def drillHoles(layer, drill_layer, algorithm):
             for obj in drill_layer.objects:
                 obj.select_set(True)
                 vert_count_before += len(obj.data.vertices)
-            bpy.context.view_layer.objects.active = layer
+            view_layer.objects.active = layer
             getattr(getattr(bpy.ops, 'object'), 'boolean_auto_difference')()
             vert_count_after = len(layer.data.vertices)
             print(f'--DrillHoles: AutoBoolean vert count before: {vert_count_before}, after: {vert_count_after}, removed: {vert_count_before - vert_count_after}')
         else:
+            depsgraph = bpy.context.evaluated_depsgraph_get()
             for obj in drill_layer.objects:
                 obj_origin_dims = obj.dimensions.copy()
                 try:
-                    modifier = layer.modifiers.new(name="Boolean", type="BOOLEAN")
-                    modifier.object = obj
-                    bpy.context.view_layer.objects.active = layer
-                    bpy.ops.object.modifier_apply(modifier="Boolean")
+                    modifier_name = applyBoolean(layer, obj, depsgraph)
                 
-                    if modifier.name in obj.modifiers:
+                    if modifier_name in obj.modifiers:
                         print(f"--DrillHoles: BooleanModifier failed on object {obj.name}")
                         objects_to_keep.append(obj)
                     elif obj_origin_dims != obj.dimensions:
@@ -80,12 +80,9 @@ def drillHoles(layer, drill_layer, algorithm):
                         # 修复对象编码问题
                         fix_object_encoding(obj)
                         try:
-                            modifier = layer.modifiers.new(name="Boolean", type="BOOLEAN")
-                            modifier.object = obj
-                            bpy.context.view_layer.objects.active = layer
-                            bpy.ops.object.modifier_apply(modifier="Boolean")
+                            modifier_name = applyBoolean(layer, obj, depsgraph)
                         
-                            if modifier.name in obj.modifiers:
+                            if modifier_name in obj.modifiers:
                                 print(f"--DrillHoles: BooleanModifier failed on object {obj.name}")
                                 objects_to_keep.append(obj)
                             elif obj_origin_dims != obj.dimensions:
@@ -110,6 +107,27 @@ def drillHoles(layer, drill_layer, algorithm):
     print(f'--DrillHoles complete: Total objects to keep: {len(objects_to_keep)}')
     return objects_to_keep
 
+##
+# applies a boolean difference of the cutter on the layer without bpy.ops.object.modifier_apply,
+# the evaluated mesh is taken from the depsgraph and swapped in place of the original mesh
+# @param layer -the object to cut
+# @param cutter -the object used as the boolean operand
+# @param depsgraph -the evaluated depsgraph, fetched once by the caller
+# @param solver -'EXACT' handles the overlapping geometry of the joined layer, 'FAST' is quicker on simple layers
+# @return the name of the temporary modifier
+def applyBoolean(layer, cutter, depsgraph, solver='EXACT'):
+    modifier = layer.modifiers.new(name="Boolean", type="BOOLEAN")
+    modifier.object = cutter
+    modifier.solver = solver
+    modifier_name = modifier.name
+    depsgraph.update()
+    new_mesh = bpy.data.meshes.new_from_object(layer.evaluated_get(depsgraph))
+    layer.modifiers.remove(modifier)
+    old_mesh = layer.data
+    layer.data = new_mesh
+    bpy.data.meshes.remove(old_mesh)
+    return modifier_name
+
 def fix_object_encoding(obj):
     """修复对象的编码问题"""
     # 1. 重命名对象（清除非法字符）
@@ -1,7 +1,7 @@
 import bpy
+import bmesh
 from .report import importdata
 from bpy.types import Operator
-from mathutils import Vector
 import time
 
 class Extrude(Operator):
@@ -41,52 +41,38 @@ def extrudeLayers(svgLayers, boardThickness, copperThickness, solderMaskThicknes
     if not silkscreenThickness or silkscreenThickness < 2.54e-5:
         silkscreenThickness = 2.54e-5
     silkscreenLineWidth = 5 * silkscreenThickness
-    bpy.ops.object.select_all(action="DESELECT")
+    # layer class -> (extrude offset, location z, fill the edges with faces first)
+    layerExtrusions = {
+        "outline": ((0, 0, boardThickness), 0, True),
+        "bottomsilk": ((silkscreenLineWidth, silkscreenLineWidth, silkscreenThickness), -silkscreenThickness/2, False),
+        "bottom": ((copperThickness, copperThickness, copperThickness/5), - copperThickness/3, False),
+        "top": ((copperThickness, copperThickness, copperThickness/5), boardThickness - 2 * copperThickness / 3, False),
+        "topsilk": ((silkscreenLineWidth, silkscreenLineWidth, silkscreenThickness), boardThickness - silkscreenThickness/2, False),
+    }
     for layerClass, layer in svgLayers.items():
-        if bpy.context:
-            if layerClass == "outline":
-                bpy.context.view_layer.objects.active = layer
-                bpy.ops.object.editmode_toggle()
-                bpy.ops.mesh.select_all(action="SELECT")
-                bpy.ops.mesh.edge_face_add()
-                bpy.ops.mesh.select_all(action="SELECT")
-                bpy.ops.mesh.extrude_region_move(MESH_OT_extrude_region={"use_normal_flip":False, "mirror":False}, TRANSFORM_OT_translate={"value":Vector((0, 0, boardThickness))})
-                bpy.ops.object.editmode_toggle()
-                layer.location.z = 0
-            elif layerClass == 'bottomsilk':
-                bpy.context.view_layer.objects.active = layer
-                bpy.ops.object.editmode_toggle()
-                bpy.ops.mesh.select_all(action="SELECT")
-                bpy.ops.mesh.extrude_region_move(MESH_OT_extrude_region={"use_normal_flip":False, "mirror":False}, TRANSFORM_OT_translate={"value":Vector((silkscreenLineWidth, silkscreenLineWidth, silkscreenThickness))})
-                bpy.ops.object.editmode_toggle()
-                layer.location.z = -silkscreenThickness/2
-            elif layerClass == "bottom":
-                bpy.context.view_layer.objects.active = layer
-                bpy.ops.object.editmode_toggle()
-                bpy.ops.mesh.select_all(action="SELECT")
-                bpy.ops.mesh.extrude_region_move(MESH_OT_extrude_region={"use_normal_flip":False, "mirror":False}, TRANSFORM_OT_translate={"value":Vector((copperThickness, copperThickness, copperThickness/5))})
-                bpy.ops.object.editmode_toggle()
-                layer.location.z = - copperThickness/3
-            elif layerClass == "top":
-                bpy.context.view_layer.objects.active = layer
-                bpy.ops.object.editmode_toggle()
-                bpy.ops.mesh.select_all(action="SELECT")
-                bpy.ops.mesh.extrude_region_move(MESH_OT_extrude_region={"use_normal_flip":False, "mirror":False}, TRANSFORM_OT_translate={"value":Vector((copperThickness, copperThickness, copperThickness/5))})
-                bpy.ops.object.editmode_toggle()
-                layer.location.z = boardThickness - 2 * copperThickness / 3
-            elif layerClass == "topsilk":
-                bpy.context.view_layer.objects.active = layer
-                bpy.ops.object.editmode_toggle()
-                bpy.ops.mesh.select_all(action="SELECT")
-                bpy.ops.mesh.extrude_region_move(MESH_OT_extrude_region={"use_normal_flip":False, "mirror":False}, TRANSFORM_OT_translate={"value":Vector((silkscreenLineWidth, silkscreenLineWidth, silkscreenThickness))})
-                bpy.ops.object.editmode_toggle()
-                layer.location.z = boardThickness - silkscreenThickness/2
-            elif layerClass == "drill":
-                for obj in layer.objects:
-                    bpy.context.view_layer.objects.active = obj
-                    bpy.ops.object.editmode_toggle()
-                    bpy.ops.mesh.select_all(action="SELECT")
-                    bpy.ops.mesh.extrude_region_move(MESH_OT_extrude_region={"use_normal_flip":False, "mirror":False}, TRANSFORM_OT_translate={"value":Vector((0, 0, boardThickness + 4e-4))})
-                    bpy.ops.object.editmode_toggle()
-                    obj.location.z = -2e-4   # -0.1mm to 1.8mm if board thinkness is 1.6mm
+        if layerClass == "drill":
+            for obj in layer.objects:
+                extrudeMesh(obj, (0, 0, boardThickness + 4e-4))
+                obj.location.z = -2e-4   # -0.1mm to 1.8mm if board thinkness is 1.6mm
+        elif layerClass in layerExtrusions:
+            offset, location_z, fill = layerExtrusions[layerClass]
+            extrudeMesh(layer, offset, fill)
+            layer.location.z = location_z
 
+##
+# extrudes the whole mesh of an object in a single bmesh pass, the same as edit mode
+# edge_face_add and extrude_region_move with everything selected, but without the operator scene updates
+# @param obj -the object whose mesh is extruded
+# @param offset -the translation of the extruded region
+# @param fill -create faces from the edges before extruding
+def extrudeMesh(obj, offset, fill=False):
+    bm = bmesh.new()
+    bm.from_mesh(obj.data)
+    if fill:
+        bmesh.ops.contextual_create(bm, geom=bm.verts[:] + bm.edges[:])
+    extruded = bmesh.ops.extrude_face_region(bm, geom=bm.verts[:] + bm.edges[:] + bm.faces[:])
+    verts = [elem for elem in extruded['geom'] if isinstance(elem, bmesh.types.BMVert)]
+    bmesh.ops.translate(bm, vec=offset, verts=verts)
+    bm.to_mesh(obj.data)
+    bm.free()
+    obj.data.update()
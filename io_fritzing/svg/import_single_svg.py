@@ -65,7 +65,33 @@ class ImportSingleSVG(Operator):
         return {"FINISHED"}
 
 
-def import_svg(layerClass: str, file: str):
+##
+# Size of one svg user unit in blender units after import_svg has scaled the layer\n
+# The curve import maps the viewBox onto the width and height at 90 dpi, and step 6 of import_svg
+# takes out its conversion of physical units again, so one px ends up as 1/90 inch in meters
+# @param root -the root <svg> element, None if the file could not be parsed
+# @return the size, None if the svg sizes cannot be read
+def svgUnitLength(root):
+    if root is None:
+        return None
+    scale = 1.0
+    view_box = root.attrib.get('viewBox')
+    if view_box:
+        try:
+            vw, vh = (float(value) for value in view_box.replace(',', ' ').split()[2:4])
+            width_token, width_end = read_float(root.attrib['width'])
+            height_token, height_end = read_float(root.attrib['height'])
+            width = float(width_token) * units[root.attrib['width'][width_end:].strip()]
+            height = float(height_token) * units[root.attrib['height'][height_end:].strip()]
+        except (KeyError, ValueError):
+            return None
+        if vw == 0 or vh == 0 or width == 0 or height == 0:
+            return None
+        scale = min(width / vw, height / vh)
+    return scale / 90 * 0.0254
+
+
+
     print(f'Importing svg file: layer[{layerClass}], file[{file}]')
     # 1. deselect all
     bpy.ops.object.select_all(action='DESELECT')
@@ -181,6 +207,9 @@ def import_svg(layerClass: str, file: str):
         # apply blender unit scale:
         unitscale = bpy.context.scene.unit_settings.scale_length / unitscale
 
+    # 5.1 size of one svg user unit after the scale, remove_extra_verts merges vertices within half of it
+    svg_unit = svgUnitLength(root)
+
     # 6. scale the new layer
     if unitscale != 1.0:
         mat_scale = Matrix.LocRotScale(None, None, (unitscale, unitscale, unitscale))
@@ -212,6 +241,8 @@ def import_svg(layerClass: str, file: str):
     else:
         layer = bpy.context.selected_objects[0]
         layer.name = collectionName
+        if svg_unit is not None:
+            layer['svg_unit'] = svg_unit
 
     # 8.2 add layer to the top pcb collection
     if fritzingPcbCollectionName not in bpy.data.collections:
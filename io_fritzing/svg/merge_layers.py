@@ -10,18 +10,18 @@ class MergeLayers(Operator):
         try:
             svgLayers = importdata.svgLayers
             joinedLayer = None
-            if svgLayers:
-                bpy.ops.object.select_all(action="DESELECT")
-                for layerClass, layer in svgLayers.items():
-                    if layerClass != 'drill':
-                        layer.select_set(True)
-                for layerClass, layer in svgLayers.items():
-                    if layerClass != 'drill' and bpy.context:
-                        bpy.context.view_layer.objects.active = layer
-                        break
-                bpy.ops.object.join()
-                if bpy.context:
-                    joinedLayer = bpy.context.view_layer.objects.active
+            if svgLayers and context:
+                layers = [layer for layerClass, layer in svgLayers.items() if layerClass != 'drill']
+                # only deselect what is actually selected instead of select_all over the whole scene
+                for obj in context.selected_objects:
+                    if obj not in layers:
+                        obj.select_set(False)
+                for layer in layers:
+                    layer.select_set(True)
+                if layers:
+                    context.view_layer.objects.active = layers[0]
+                    bpy.ops.object.join()
+                    joinedLayer = context.view_layer.objects.active
                     if joinedLayer:
                         joinedLayer.name = 'JoinedLayer'
         except Exception as e:
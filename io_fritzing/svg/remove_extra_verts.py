@@ -1,4 +1,5 @@
 import bpy
+import bmesh
 from .report import importdata
 from bpy.types import Operator
 
@@ -9,10 +10,9 @@ class RemoveExtraVerts(Operator):
     def execute(self, context):
         try:
             svgLayers = importdata.svgLayers
-            bpy.ops.object.select_all(action="SELECT")
             for layerClass, layer in svgLayers.items():
                 if layerClass != 'drill':
-                    removeExtraVerts(layer)
+                    removeExtraVerts(layer, mergeDistance(layer))
         except Exception as e:
             print('--RemoveExtraVerts exception: ' + str(e))
             importdata.error_msg = str(e)
@@ -22,14 +22,26 @@ class RemoveExtraVerts(Operator):
         return {"FINISHED"}
         
 
+##
+# merge distance for layers that do not carry their svg unit, the remove_doubles default
+DEFAULT_MERGE_DISTANCE = 1e-4
+
+##
+# The distance to merge the vertices of a layer within: half an svg user unit after the import scale,
+# the svg coordinates are not more precise than that, so closer points are duplicates
+# @param layer -the layer object, import_svg stores the size of its svg user unit as layer['svg_unit']
+def mergeDistance(layer):
+    svg_unit = layer.get('svg_unit')
+    return 0.5 * svg_unit if svg_unit else DEFAULT_MERGE_DISTANCE
+
 ##
 # Removes the overlapping vertices on all layers
-def removeExtraVerts(layer):
-    if bpy.context:
-        bpy.context.view_layer.objects.active = layer
-        bpy.ops.object.editmode_toggle()
-        bpy.ops.mesh.select_mode(type="VERT")
-        bpy.ops.mesh.select_all(action="SELECT")
-        bpy.ops.mesh.remove_doubles()
-        bpy.ops.mesh.select_all(action="DESELECT")
-        bpy.ops.object.editmode_toggle()
+# @param layer -the layer object
+# @param dist -the maximum distance between vertices to merge
+def removeExtraVerts(layer, dist):
+    bm = bmesh.new()
+    bm.from_mesh(layer.data)
+    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=dist)
+    bm.to_mesh(layer.data)
+    bm.free()
+    layer.data.update()
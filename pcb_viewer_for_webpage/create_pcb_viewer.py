@@ -16,10 +16,8 @@ tags = ["<!DOCTYPE html>", "<html>", "<head>", "<style>", ".controls{", "width:
 
 ##
 # list holding the names of the .svg files to bring into the webpage, read from the file filenames.txt
-layerNames = []
 with open("filenames.txt", "r") as fromFile:
-    for line in fromFile:
-        layerNames.append(line[0:-1])
+    layerNames = fromFile.read().splitlines()
 
 
 
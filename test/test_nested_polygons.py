@@ -0,0 +1,52 @@
+import ast
+import os
+import time
+
+import numpy as np
+
+# import_single_layer.py imports bpy at the top, so only the pure numpy helpers are loaded from its source
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "individual selection scripts", "import_single_layer.py")
+HELPERS = ("overlapping_bounds", "point_in_polygon", "polygon_edges_cross", "has_nested_polygons")
+
+
+def load_helpers():
+    with open(SCRIPT, encoding="utf-8") as file:
+        tree = ast.parse(file.read())
+    nodes = [node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name in HELPERS]
+    namespace = {}
+    exec(compile(ast.Module(nodes, []), SCRIPT, "exec"), namespace)
+    return namespace
+
+
+def square(x, y, half):
+    return np.array([[x - half, y - half], [x + half, y - half], [x + half, y + half], [x - half, y + half]], dtype=float)
+
+
+def pad_grid(count):
+    # separate pads on a 1mm pitch, like the copper layer of a dense board
+    side = int(np.ceil(np.sqrt(count)))
+    return [square(i % side, i // side, 0.3) for i in range(count)]
+
+
+if __name__ == "__main__":
+    helpers = load_helpers()
+    has_nested_polygons = helpers["has_nested_polygons"]
+
+    assert has_nested_polygons([square(0, 0, 2), square(0, 0, 1)]), "pad ring not detected"
+    assert has_nested_polygons([square(0, 0, 1), square(1, 0, 1)]), "overlapping sub paths not detected"
+    assert not has_nested_polygons([square(0, 0, 1), square(2, 0, 1)]), "touching sub paths reported as nested"
+    assert not has_nested_polygons([square(0, 0, 1), square(5, 0, 1)]), "separate sub paths reported as nested"
+
+    # separate pads give no candidate pairs, so only the sort and sweep runs
+    for count in (500, 1000, 2000, 4000):
+        polygons = pad_grid(count)
+        bounds = np.array([np.concatenate([polygon.min(axis=0), polygon.max(axis=0)]) for polygon in polygons])
+        first, _ = helpers["overlapping_bounds"](bounds)
+        start = time.perf_counter()
+        nested = has_nested_polygons(polygons)
+        elapsed = time.perf_counter() - start
+        print(f"{count} sub paths: {len(first)} candidate pairs, {elapsed * 1000:.1f} ms")
+        assert len(first) == 0 and not nested
+        assert elapsed < 0.5, "the nested sub path check is no longer close to linear"
+
+    print("nested sub path check ok")